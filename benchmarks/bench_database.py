@@ -0,0 +1,263 @@
+"""
+Database scale benchmark
+Builds synthetic multi-year histories (synthetic_history.py) at each scale
+point and reports p50/p99 latency of every DatabaseManager method and of the
+database-backed slash commands (run cold: the report cache is cleared before
+every call, Discord is replaced by an in-process recorder).
+
+Scale points are MEMBERSxCLUBSxDAYS (members per club).
+
+Usage: python benchmarks/bench_database.py [--scales 30x1x30 30x3x365 50x10x1095] [--repeat 50]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from database import AsyncDatabase, DatabaseManager
+from synthetic_history import generate
+
+# Writes that rewrite or scan everything are run only a few times
+HEAVY_REPEAT = 3
+
+
+def percentiles(timings):
+    """(p50, p99) in milliseconds"""
+    ordered = sorted(timings)
+    p99 = ordered[min(len(ordered) - 1, round(0.99 * (len(ordered) - 1)))]
+    return statistics.median(ordered) * 1000, p99 * 1000
+
+
+def parse_scale(text):
+    members, clubs, days = (int(part) for part in text.lower().split('x'))
+    return members, clubs, days
+
+
+class Context:
+    """Real members, names and clubs from the generated database, sampled per call"""
+
+    def __init__(self, db, seed=0):
+        self.rng = random.Random(seed)
+        rows = db.conn.execute("SELECT friend_id, current_name, club FROM members").fetchall()
+        self.friend_ids = [r['friend_id'] for r in rows]
+        self.names = [r['current_name'] for r in rows]
+        self.clubs = sorted({r['club'] for r in rows})
+        self.now = datetime.now()
+        self.writes = 0
+
+    def friend_id(self):
+        return self.rng.choice(self.friend_ids)
+
+    def name_fragment(self):
+        name = self.rng.choice(self.names)
+        start = self.rng.randint(0, max(len(name) - 4, 0))
+        return name[start:start + 4]
+
+    def club(self):
+        return self.rng.choice(self.clubs)
+
+    def next_scrape(self, db, club):
+        """The club's latest roster, a little richer, a few minutes after the last write"""
+        self.writes += 1
+        latest = db.get_latest_snapshot(club)
+        members = [dict(m, fans=m['fans'] + self.rng.randint(0, 100_000)) for m in latest['members']]
+        return members, self.now + timedelta(minutes=self.writes)
+
+
+def method_cases(ctx):
+    """(label, call(db), repeat multiplier) for every DatabaseManager method"""
+    today = ctx.now.date()
+    two_weeks = ((today - timedelta(days=13)).isoformat(), today.isoformat())
+    return [
+        ('get_leaderboard daily', lambda db: db.get_leaderboard('daily', ctx.club()), 1),
+        ('get_leaderboard weekly', lambda db: db.get_leaderboard('weekly', ctx.club()), 1),
+        ('get_leaderboard monthly', lambda db: db.get_leaderboard('monthly', ctx.club()), 1),
+        ('get_range_leaderboard 14d', lambda db: db.get_range_leaderboard(*two_weeks, club=ctx.club()), 1),
+        ('get_range_gain 14d', lambda db: db.get_range_gain(ctx.friend_id(), *two_weeks), 1),
+        ('get_period_history weekly', lambda db: db.get_period_history(ctx.friend_id(), 'weekly'), 1),
+        ('get_quota_inputs', lambda db: db.get_quota_inputs(
+            datetime.combine(today - timedelta(days=today.weekday()), datetime.min.time()),
+            club=ctx.club()), 1),
+        ('search_members', lambda db: db.search_members(ctx.name_fragment()), 1),
+        ('get_name_history', lambda db: db.get_name_history(ctx.friend_id()), 1),
+        ('lookup_member', lambda db: db.lookup_member(ctx.name_fragment()), 1),
+        ('get_lifetime_stats member', lambda db: db.get_lifetime_stats(friend_id=ctx.friend_id()), 1),
+        ('get_lifetime_stats club', lambda db: db.get_lifetime_stats(club=ctx.club()), 1),
+        ('get_latest_snapshot', lambda db: db.get_latest_snapshot(ctx.club()), 1),
+        ('get_scrape_state', lambda db: db.get_scrape_state(ctx.club()), 1),
+        # Writes
+        ('record_heartbeat', lambda db: db.record_heartbeat(ctx.club(), 'no-match'), 1),
+        ('save_snapshot', lambda db: save_next(db, ctx), 1),
+        ('rebuild_rollups', lambda db: db.rebuild_rollups(), 0),
+        ('apply_retention', lambda db: db.apply_retention(), 0),
+        ('maintain', lambda db: db.maintain(), 0),
+    ]
+
+
+def save_next(db, ctx):
+    club = ctx.club()
+    members, when = ctx.next_scrape(db, club)
+    started = time.perf_counter()
+    db.save_snapshot(members, club=club, when=when)
+    return time.perf_counter() - started
+
+
+def time_methods(db, ctx, repeat):
+    results = []
+    for label, call, multiplier in method_cases(ctx):
+        timings = []
+        for _ in range(repeat * multiplier or HEAVY_REPEAT):
+            started = time.perf_counter()
+            measured = call(db)
+            elapsed = time.perf_counter() - started
+            # save_snapshot times only the write, not preparing the next roster
+            timings.append(measured if label == 'save_snapshot' else elapsed)
+        results.append((label, *percentiles(timings)))
+    return results
+
+
+class RecordingFollowup:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, *args, **kwargs):
+        self.sent.append((args, kwargs))
+
+
+class RecordingResponse(RecordingFollowup):
+    async def defer(self, **kwargs):
+        pass
+
+    async def send_message(self, *args, **kwargs):
+        await self.send(*args, **kwargs)
+
+    def is_done(self):
+        return False
+
+
+class AdminInteraction:
+    """An administrator's slash command; replies are recorded, not sent"""
+
+    def __init__(self):
+        self.user = SimpleNamespace(guild_permissions=SimpleNamespace(administrator=True))
+        self.response = RecordingResponse()
+        self.followup = RecordingFollowup()
+        self.command = None
+
+
+def handler_cases(bot, ctx):
+    """(label, coroutine factory) for the slash commands that read the database"""
+    from discord import app_commands
+
+    def choice(value):
+        return app_commands.Choice(name=value, value=value)
+
+    start = (ctx.now.date() - timedelta(days=13)).isoformat()
+    return [
+        ('/leaderboard weekly', lambda i: bot.leaderboard.callback(
+            i, choice('weekly'), choice(ctx.club()))),
+        ('/leaderboard_range 14d', lambda i: bot.leaderboard_range.callback(
+            i, start, None, None, choice(ctx.club()))),
+        ('/quota', lambda i: bot.quota_status.callback(i, choice(ctx.club()))),
+        ('/member_lookup', lambda i: bot.member_lookup.callback(i, ctx.name_fragment())),
+        ('/member_lookup autocomplete', lambda i: bot.member_lookup_autocomplete(
+            i, ctx.name_fragment())),
+        ('/club_file', lambda i: bot.club_file.callback(i, choice(ctx.club()))),
+        ('/stats', lambda i: bot.stats.callback(i)),
+    ]
+
+
+async def time_handlers(bot, ctx, repeat):
+    results = []
+    for label, handler in handler_cases(bot, ctx):
+        timings = []
+        for _ in range(repeat):
+            bot.report_cache.clear()
+            interaction = AdminInteraction()
+            started = time.perf_counter()
+            await handler(interaction)
+            timings.append(time.perf_counter() - started)
+            if not (interaction.followup.sent or interaction.response.sent) and 'autocomplete' not in label:
+                raise RuntimeError(f"{label} did not reply")
+        results.append((label, *percentiles(timings)))
+    return results
+
+
+def import_bot(workdir):
+    """discord_bot with its settings pointed at the sandbox (it opens DB_PATH on import)"""
+    os.environ.update({
+        'DB_PATH': os.path.join(workdir, 'bot.db'),
+        'OUTPUT_DIR': os.path.join(workdir, 'output'),
+        'SCRAPE_ISOLATION': 'inline',
+        'SCRAPE_EXPORTS': '',
+        'GUILD_ID': '1',
+        'CHANNEL_ID': '2',
+    })
+    import discord_bot
+    discord_bot.setup()
+    logging.getLogger().setLevel(logging.WARNING)
+    return discord_bot
+
+
+async def bench_handlers(bot, path, ctx, repeat):
+    previous = bot.scraper_bot.db
+    bot.scraper_bot.db = AsyncDatabase(path)
+    try:
+        return await time_handlers(bot, ctx, repeat)
+    finally:
+        await bot.scraper_bot.db.close()
+        bot.scraper_bot.db = previous
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scales', nargs='+', default=['30x1x30', '30x3x365', '50x10x1095'])
+    parser.add_argument('--scrapes-per-day', type=float, default=1.2)
+    parser.add_argument('--churn', type=float, default=0.05)
+    parser.add_argument('--renames', type=float, default=0.02)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--no-handlers', action='store_true', help='Skip the slash-command timings')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        bot = None if args.no_handlers else import_bot(workdir)
+        for scale in args.scales:
+            members, clubs, days = parse_scale(scale)
+            path = os.path.join(workdir, f"{scale}.db")
+            db = DatabaseManager(path)
+            started = time.perf_counter()
+            rows = generate(db, members, clubs, days, args.scrapes_per_day,
+                            args.churn, args.renames)
+            db.maintain()
+            built = time.perf_counter() - started
+            print(f"\n📦 {scale}: {members} members x {clubs} clubs x {days} days, "
+                  f"{rows:,} snapshots, {os.path.getsize(path) / 2**20:.1f} MB (built in {built:.1f}s)")
+
+            ctx = Context(db)
+            results = []
+            if bot:
+                # Before the write benchmarks change the data under them
+                results += asyncio.run(bench_handlers(bot, path, ctx, args.repeat))
+            results = time_methods(db, ctx, args.repeat) + results
+            db.conn.close()
+
+            print(f"{'call':<30} {'p50 ms':>9} {'p99 ms':>9}")
+            for label, p50, p99 in results:
+                print(f"{label:<30} {p50:>9.2f} {p99:>9.2f}")
+        if bot:
+            asyncio.run(bot.scraper_bot.db.close())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+"""
+Leaderboard query benchmark
+Fills throwaway databases with years of synthetic daily snapshots, checks that
+the period and date-range leaderboards read only rollups and member history is
+served by an index, and times them against the raw-snapshot queries they replaced.
+Finally applies snapshot retention and reports the database size before/after.
+
+Usage: python benchmarks/bench_leaderboard.py [--members 30 300] [--days 30 365 1095]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager, LEADERBOARD_QUERY, RANGE_LEADERBOARD_QUERY, period_start
+
+# Window query over raw snapshots (before rollups), kept here for comparison
+SNAPSHOT_LEADERBOARD_QUERY = '''
+SELECT
+    m.current_name,
+    (p.end_fans - p.start_fans) as period_gain
+FROM (
+    SELECT
+        member_id,
+        FIRST_VALUE(total_fans) OVER w as start_fans,
+        LAST_VALUE(total_fans) OVER w as end_fans,
+        ROW_NUMBER() OVER w as rn
+    FROM snapshots
+    WHERE timestamp >= ?
+    WINDOW w AS (
+        PARTITION BY member_id ORDER BY timestamp
+        ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING
+    )
+) p
+JOIN members m ON m.id = p.member_id
+WHERE p.rn = 1 AND m.is_active = 1
+ORDER BY period_gain DESC
+'''
+
+# The original GROUP BY query, kept here for comparison
+LEGACY_LEADERBOARD_QUERY = '''
+WITH
+CurrentState AS (
+    SELECT member_id, MAX(timestamp), total_fans as end_fans
+    FROM snapshots
+    GROUP BY member_id
+),
+BaselineState AS (
+    SELECT s.member_id, s.total_fans as start_fans
+    FROM snapshots s
+    JOIN (
+        SELECT member_id, MIN(timestamp) as min_time
+        FROM snapshots
+        WHERE timestamp >= ?
+        GROUP BY member_id
+    ) first_s ON s.member_id = first_s.member_id AND s.timestamp = first_s.min_time
+)
+SELECT
+    m.current_name,
+    (curr.end_fans - base.start_fans) as period_gain
+FROM members m
+JOIN CurrentState curr ON m.id = curr.member_id
+JOIN BaselineState base ON m.id = base.member_id
+WHERE m.is_active = 1
+ORDER BY period_gain DESC
+'''
+
+MEMBER_HISTORY_QUERY = "SELECT total_fans, timestamp FROM snapshots WHERE member_id = ? ORDER BY timestamp DESC LIMIT 1"
+
+
+def fill(db, members, days, seed=0):
+    """One scrape per day (plus the odd manual one) for `days` days up to now"""
+    rng = random.Random(seed)
+    ids = [str(100_000_000_000 + i) for i in range(members)]
+    db.conn.executemany(
+        "INSERT INTO members (friend_id, current_name, is_active, club) VALUES (?, ?, 1, 'Bench')",
+        [(fid, f"Trainer{i:04d}") for i, fid in enumerate(ids)])
+
+    keys = dict(db.conn.execute("SELECT friend_id, id FROM members").fetchall())
+
+    fans = {fid: rng.randint(1_000_000, 50_000_000) for fid in ids}
+    start = datetime.now().replace(hour=8, minute=0, second=0, microsecond=0) - timedelta(days=days)
+    rows = []
+    for day in range(days):
+        scrapes = [start + timedelta(days=day)]
+        if rng.random() < 0.2:
+            scrapes.append(scrapes[0] + timedelta(hours=rng.randint(1, 12)))
+        for ts in scrapes:
+            stamp = int(ts.timestamp())
+            for fid in ids:
+                gain = rng.randint(0, 1_500_000)
+                fans[fid] += gain
+                rows.append((keys[fid], stamp, fans[fid], gain))
+    db.conn.executemany(
+        "INSERT INTO snapshots (member_id, timestamp, total_fans, daily_gain_ingame) VALUES (?, ?, ?, ?)",
+        rows)
+    db.conn.commit()
+    db.rebuild_rollups()
+    db.conn.execute("ANALYZE")
+    return len(rows)
+
+
+def plan(db, query, params):
+    return [row[3] for row in db.conn.execute("EXPLAIN QUERY PLAN " + query, params)]
+
+
+def check_plans(db):
+    """Fail loudly if the hot queries stop using their indexes"""
+    problems = []
+    leaderboard = plan(db, LEADERBOARD_QUERY, ('weekly', period_start('weekly'), None, None))
+    if not any(step.startswith('SEARCH r USING PRIMARY KEY') for step in leaderboard):
+        problems.append(f"leaderboard does not seek its rollup bucket: {leaderboard}")
+    if any('snapshots' in step for step in leaderboard):
+        problems.append(f"leaderboard reads snapshots: {leaderboard}")
+
+    ranged = plan(db, RANGE_LEADERBOARD_QUERY, {'start': '2000-01-01', 'end': '2000-01-14',
+                                                'club': None, 'limit': 10})
+    if any('snapshots' in step or step.startswith('SCAN rollups') for step in ranged):
+        problems.append(f"range leaderboard scans instead of seeking checkpoints: {ranged}")
+
+    history = plan(db, MEMBER_HISTORY_QUERY, (1,))
+    if not any('PRIMARY KEY' in step for step in history):
+        problems.append(f"member history does not seek the snapshots primary key: {history}")
+    return problems
+
+
+def check_results(db, week_start):
+    """The rollup leaderboard must agree with the raw-snapshot query"""
+    rollup = sorted((r['current_name'], r['period_gain']) for r in db.get_leaderboard('weekly'))
+    raw = sorted(tuple(r) for r in db.conn.execute(SNAPSHOT_LEADERBOARD_QUERY, (week_start,)))
+    if rollup != raw:
+        return ["weekly rollup leaderboard differs from the snapshot query"]
+
+    # Range gains against raw snapshots: last fans up to the end day minus
+    # last fans before the start day
+    start, end = range_bounds(14)
+    start_ts = int(datetime.fromisoformat(start).timestamp())
+    end_ts = int((datetime.fromisoformat(end) + timedelta(days=1)).timestamp())
+    expected = {}
+    for member_id, name in db.conn.execute("SELECT id, current_name FROM members"):
+        before = db.conn.execute(
+            "SELECT total_fans FROM snapshots WHERE member_id = ? AND timestamp < ? "
+            "ORDER BY timestamp DESC LIMIT 1", (member_id, start_ts)).fetchone()
+        after = db.conn.execute(
+            "SELECT total_fans FROM snapshots WHERE member_id = ? AND timestamp < ? "
+            "ORDER BY timestamp DESC LIMIT 1", (member_id, end_ts)).fetchone()
+        expected[name] = after[0] - before[0]
+    ranged = {r['current_name']: r['period_gain'] for r in db.get_range_leaderboard(start, end)}
+    return [] if ranged == expected else ["range leaderboard differs from raw snapshots"]
+
+
+def check_retention(db):
+    """Downsample old snapshots; lifetime stats and leaderboards must not move"""
+    lifetime = db.get_lifetime_stats(active_only=False)
+    weekly = db.get_leaderboard('weekly')
+    before = db.maintain()['size_mb']
+    db.apply_retention()
+    after = db.maintain()['size_mb']
+    problems = []
+    if db.get_lifetime_stats(active_only=False) != lifetime:
+        problems.append("retention changed lifetime stats")
+    if db.get_leaderboard('weekly') != weekly:
+        problems.append("retention changed the weekly leaderboard")
+    return before, after, problems
+
+
+def range_bounds(days):
+    """ISO start and end dates of the last `days` days"""
+    today = datetime.now().date()
+    return (today - timedelta(days=days - 1)).isoformat(), today.isoformat()
+
+
+def timed(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--members', type=int, nargs='+', default=[30, 300])
+    parser.add_argument('--days', type=int, nargs='+', default=[30, 365, 1095])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    now = datetime.now()
+    week_start = int((now - timedelta(days=now.weekday())).replace(
+        hour=0, minute=0, second=0, microsecond=0).timestamp())
+
+    failures = []
+    print(f"{'members':>7} {'days':>5} {'rows':>9} {'week ms':>8} {'month ms':>9} "
+          f"{'14 days ms':>10} {'snapshot week ms':>17} {'legacy week ms':>15} {'MB':>6} {'retained MB':>12}")
+    for members in args.members:
+        for days in args.days:
+            with tempfile.TemporaryDirectory() as tmp:
+                db = DatabaseManager(os.path.join(tmp, 'bench.db'))
+                rows = fill(db, members, days)
+                failures += check_plans(db)
+                failures += check_results(db, week_start)
+
+                week = timed(lambda: db.get_leaderboard('weekly'), args.repeat)
+                month = timed(lambda: db.get_leaderboard('monthly'), args.repeat)
+                ranged = timed(lambda: db.get_range_leaderboard(*range_bounds(14)), args.repeat)
+                snapshot = timed(lambda: db.conn.execute(
+                    SNAPSHOT_LEADERBOARD_QUERY, (week_start,)).fetchall(), args.repeat)
+                legacy = timed(lambda: db.conn.execute(
+                    LEGACY_LEADERBOARD_QUERY, (week_start,)).fetchall(), args.repeat)
+                size, retained, problems = check_retention(db)
+                failures += problems
+                db.conn.close()
+            print(f"{members:>7} {days:>5} {rows:>9} {week:>8.2f} {month:>9.2f} "
+                  f"{ranged:>10.2f} {snapshot:>17.2f} {legacy:>15.2f} {size:>6.1f} {retained:>12.1f}")
+
+    if failures:
+        for problem in failures:
+            print(f"❌ {problem}")
+        sys.exit(1)
+    print("✅ Leaderboards read rollups only, match the snapshot queries and survive retention")
+
+
+if __name__ == '__main__':
+    main()
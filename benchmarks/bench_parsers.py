@@ -0,0 +1,87 @@
+"""
+Parser backend benchmark
+Times every available backend over the synthetic fixture pages, reports peak
+memory and checks that each one produces exactly the same members as the bs4
+baseline, on those pages and on edge cases (blank page, XML declaration).
+Peak memory comes from tracemalloc, so C-level allocations inside lxml and
+selectolax are only partly counted.
+
+Usage: python benchmarks/bench_parsers.py [--sizes 30 300 1000 3000] [--repeat 5]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'chronogenesis_scraper'))
+
+from fixtures import DEFAULT_SIZES, edge_case_pages, load_fixture
+from parsers import PARSER_BACKENDS, backend_available
+from scraper import ChrononesisClubScraper
+
+
+def run_backend(scraper, html, repeat):
+    """Median parse time over `repeat` runs, plus peak traced memory of one run"""
+    timings = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            started = time.perf_counter()
+            members = scraper.parse_html(html)
+            timings.append(time.perf_counter() - started)
+
+        tracemalloc.start()
+        scraper.parse_html(html)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return members, statistics.median(timings), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES))
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    backends = [b for b in PARSER_BACKENDS if backend_available(b)]
+    missing = [b for b in PARSER_BACKENDS if b not in backends]
+    if missing:
+        print(f"⚠️ Skipping unavailable backends: {', '.join(missing)}")
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        scrapers = {b: ChrononesisClubScraper(output_dir=tmp, parser=b) for b in backends}
+
+        pages = [(str(size), load_fixture(size), size) for size in args.sizes] + edge_case_pages()
+        print(f"{'page':>8} {'backend':<11} {'median ms':>10} {'peak MiB':>9} {'vs bs4':>7}  output")
+        for label, html, size in pages:
+            baseline = None
+            baseline_time = None
+            for backend in backends:
+                try:
+                    members, median, peak = run_backend(scrapers[backend], html, args.repeat)
+                except Exception as e:
+                    failures += 1
+                    print(f"{label:>8} {backend:<11} ❌ {type(e).__name__}: {e}")
+                    continue
+                if baseline is None:
+                    baseline, baseline_time = members, median
+                identical = members == baseline and len(members) == size
+                failures += not identical
+                print(f"{label:>8} {backend:<11} {median * 1000:>10.2f} {peak / 2**20:>9.2f} "
+                      f"{baseline_time / median:>6.1f}x  {'identical' if identical else 'MISMATCH'}")
+
+    if failures:
+        print(f"❌ {failures} backend/page combinations did not match the bs4 baseline")
+        sys.exit(1)
+    print("✅ All backends produced identical output")
+
+
+if __name__ == '__main__':
+    main()
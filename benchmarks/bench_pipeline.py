@@ -0,0 +1,302 @@
+"""
+End-to-end scrape-to-post benchmark, fully offline
+Serves the checked-in synthetic club_profile fixtures (benchmarks/fixtures.py,
+not captures of the real site) and freshly generated N-member pages from a
+local HTTP server, drives ChrononesisClubScraperBot.run_scrape through the
+bot's run_and_notify (the scheduled post and /scrape_now) with the Discord
+channel replaced by an in-process recorder, and reports wall time per
+pipeline stage, throughput over many clubs and peak memory.
+
+Pages are loaded by a minimal HTTP tab by default (no Chrome, so it runs in
+CI); --browser chrome drives a real headless Chrome against the same server.
+
+Usage: python benchmarks/bench_pipeline.py [--sizes 30 300] [--clubs 1 10] [--browser http|chrome]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import logging
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, 'chronogenesis_scraper'))
+
+from fixtures import CHECKED_IN_SIZES, load_fixture, make_club_page
+
+# Club names encode the page to serve: Bench<members>x<index>
+CLUB_NAME = re.compile(r'Bench(\d+)x(\d+)$')
+
+# Stages in pipeline order, for the breakdown lines
+STAGE_ORDER = ('browser_start', 'navigation', 'cloudflare', 'table', 'stabilize', 'fixed_wait',
+               'get_content', 'parse', 'normalize', 'scrape', 'save_snapshot', 'embed_send')
+
+
+class StandInSite(ThreadingHTTPServer):
+    """
+    club_profile pages on 127.0.0.1. The first round serves the checked-in
+    synthetic fixtures; fans move every round after that so no scrape is a no-op.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, latency=0.0):
+        super().__init__(('127.0.0.1', 0), PageHandler)
+        self.latency = latency
+        self.round = 0
+        self.requests = 0
+        self._pages = {}
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def page(self, club):
+        key = (club, self.round)
+        if key not in self._pages:
+            match = CLUB_NAME.match(club)
+            if not match:
+                return None
+            size, index = int(match.group(1)), int(match.group(2))
+            if size in CHECKED_IN_SIZES and index == 0 and self.round == 1:
+                self._pages[key] = load_fixture(size)
+            else:
+                self._pages[key] = make_club_page(size, club=club, seed=index * 1000 + self.round)
+        return self._pages[key]
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        club = parse_qs(url.query).get('circle_id', [''])[0]
+        html = self.server.page(club) if url.path == '/club_profile' else None
+        self.server.requests += 1
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if html is None:
+            self.send_error(404)
+            return
+        body = html.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class HttpTab:
+    """Just enough of a nodriver tab for ChrononesisClubScraper: get, evaluate, get_content"""
+
+    def __init__(self):
+        self.html = ''
+
+    async def get(self, url):
+        self.html = await asyncio.to_thread(
+            lambda: urllib.request.urlopen(url, timeout=30).read().decode('utf-8'))
+        return self
+
+    async def evaluate(self, expression, return_by_value=True):
+        from scraper import ROW_COUNT_JS
+        if expression == ROW_COUNT_JS:
+            return self.html.count('club-member-row-container')
+        return False  # the Cloudflare probe: the stand-in never challenges
+
+    async def get_content(self):
+        return self.html
+
+
+class HttpBrowserManager:
+    """BrowserManager stand-in handing out HttpTabs, max_tabs at a time"""
+
+    browser = None
+
+    def __init__(self, max_tabs):
+        self._slots = asyncio.Semaphore(max_tabs)
+
+    async def acquire(self):
+        await self._slots.acquire()
+        return HttpTab()
+
+    async def release(self, tab, healthy=True):
+        self._slots.release()
+
+    async def close(self):
+        pass
+
+
+class RecordingChannel:
+    """The Discord channel: keeps every embed instead of sending it"""
+
+    def __init__(self):
+        self.posts = []
+
+    async def send(self, content=None, embed=None, **kwargs):
+        self.posts.append((time.perf_counter(), content, embed))
+        return RecordingMessage(self)
+
+
+class RecordingMessage:
+    def __init__(self, channel):
+        self.channel = channel
+
+    async def edit(self, content=None, embed=None, **kwargs):
+        self.channel.posts.append((time.perf_counter(), content, embed))
+
+
+class RecordingInteraction:
+    """A /scrape_now interaction whose followups land in a RecordingChannel"""
+
+    def __init__(self):
+        self.followup = RecordingChannel()
+
+
+def member_lines(embed):
+    """Members listed in a Daily Check embed"""
+    return sum(field.value.count('`#') for field in embed.fields
+               if field.name == 'Member Performance')
+
+
+def stage_breakdown(summary):
+    parts = [f"{stage} {summary[(stage,)]['mean'] * 1000:.1f}ms"
+             for stage in STAGE_ORDER if (stage,) in summary]
+    return "   stages (mean): " + " · ".join(parts)
+
+
+async def run_scenario(bot_module, channel, site, size, n_clubs, args):
+    """One scheduled post for n_clubs clubs, then one /scrape_now; returns a result row"""
+    from browser_profile import ProcessTreeMonitor
+    from metrics import REGISTRY, STAGE_SECONDS
+
+    clubs = [f"Bench{size}x{i}" for i in range(n_clubs)]
+    REGISTRY.reset()
+    channel.posts.clear()
+    problems = []
+
+    monitor = ProcessTreeMonitor(os.getpid(), interval=0.1)
+    await monitor.start()
+
+    # Scheduled path: scrape every club, post one Daily Check each
+    site.round += 1
+    started = time.perf_counter()
+    await bot_module.run_and_notify(clubs=clubs)
+    wall = time.perf_counter() - started
+    posted = [embed for _, _, embed in channel.posts]
+    if len(posted) != n_clubs or any(member_lines(e) != size for e in posted):
+        problems.append(f"{size}x{n_clubs}: expected {n_clubs} posts of {size} members, "
+                        f"got {[member_lines(e) for e in posted]}")
+
+    # /scrape_now: cached reply first, then the edit with fresh data
+    site.round += 1
+    interaction = RecordingInteraction()
+    started = time.perf_counter()
+    await bot_module.run_and_notify(interaction, clubs=clubs[:1])
+    replies = interaction.followup.posts
+    first_reply = (replies[0][0] - started) if replies else float('nan')
+    fresh = (replies[-1][0] - started) if replies else float('nan')
+    if len(replies) != 2 or member_lines(replies[-1][2]) != size:
+        problems.append(f"{size}x{n_clubs}: /scrape_now did not reply then edit in fresh data")
+
+    resources = await monitor.stop()
+    stages = STAGE_SECONDS.summary()
+    scrape = stages.get(('scrape',), {}).get('p50', float('nan'))
+    row = (size, n_clubs, wall, n_clubs / wall, scrape, first_reply, fresh,
+           resources.get('peak_rss_mb', float('nan')))
+    return row, stage_breakdown(stages), problems
+
+
+async def run(args, workdir):
+    site = StandInSite(latency=args.latency / 1000)
+    threading.Thread(target=site.serve_forever, daemon=True).start()
+
+    # discord_bot reads its settings at import: point everything at the sandbox
+    os.environ.update({
+        'DB_PATH': os.path.join(workdir, 'bench.db'),
+        'OUTPUT_DIR': os.path.join(workdir, 'output'),
+        'SCRAPE_BASE_URL': site.url,
+        'SCRAPE_ISOLATION': 'inline',
+        'SCRAPE_CONCURRENCY': str(args.concurrency),
+        'SCRAPE_EXPORTS': '',
+        'PAGE_ARCHIVE_DIR': os.path.join(workdir, 'page_archive'),
+        'SCRAPE_BLOCK_PROFILE': 'default' if args.browser == 'chrome' else 'off',
+        'BROWSER_PROFILE': 'headless',
+        'SCRAPE_CLUB_NAMES': 'Bench30x0',
+        'GUILD_ID': '1',
+        'CHANNEL_ID': '2',
+    })
+    import discord_bot
+    discord_bot.setup()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    channel = RecordingChannel()
+    discord_bot.bot.get_channel = lambda channel_id: channel
+    runner = discord_bot.scraper_bot.scraper
+    runner.engine_options['stable_window'] = args.stable_window
+    if args.browser == 'http':
+        runner.browser_manager = HttpBrowserManager(args.concurrency)
+
+    rows, problems = [], []
+    print(f"{'members':>7} {'clubs':>5} {'wall s':>7} {'clubs/s':>8} {'scrape p50 s':>12} "
+          f"{'cached reply ms':>15} {'fresh reply s':>13} {'peak RSS MB':>11}")
+    try:
+        for size in args.sizes:
+            for n_clubs in args.clubs:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    row, stages, issues = await run_scenario(
+                        discord_bot, channel, site, size, n_clubs, args)
+                rows.append(row)
+                problems += issues
+                size_, clubs, wall, rate, scrape, first, fresh, rss = row
+                print(f"{size_:>7} {clubs:>5} {wall:>7.2f} {rate:>8.2f} {scrape:>12.2f} "
+                      f"{first * 1000:>15.1f} {fresh:>13.2f} {rss:>11.1f}")
+                print(stages)
+    finally:
+        with contextlib.redirect_stdout(io.StringIO()):
+            await discord_bot.scraper_bot.close()
+        site.shutdown()
+
+    from page_archive import PageArchive
+    archive = PageArchive(discord_bot.PAGE_ARCHIVE_DIR).stats()
+    print(f"🗄️ Page archive: {archive['fetches']} fetches, {archive['pages']} distinct pages, "
+          f"{archive['fetched_bytes'] / 2**20:.1f} MB fetched -> "
+          f"{archive['stored_bytes'] / 2**20:.2f} MB stored")
+    if archive['fetches'] != site.requests:
+        problems.append(f"{site.requests} pages served but {archive['fetches']} archived")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[30, 300])
+    parser.add_argument('--clubs', type=int, nargs='+', default=[1, 10])
+    parser.add_argument('--concurrency', type=int, default=3)
+    parser.add_argument('--browser', choices=('http', 'chrome'), default='http')
+    parser.add_argument('--latency', type=float, default=0, help='Extra server latency per page (ms)')
+    parser.add_argument('--stable-window', type=float, default=1.0,
+                        help='Seconds the row count must hold still (production default: 1.0)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        problems = asyncio.run(run(args, workdir))
+
+    if problems:
+        for problem in problems:
+            print(f"❌ {problem}")
+        sys.exit(1)
+    print("✅ Every club was scraped, saved and posted with all its members")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+Synthetic chronogenesis.net club pages for benchmarks
+Generated, not recorded: the rows follow the markup parse_member_table
+expects, inside an invented page shell, so they say nothing about whether
+the real site still matches it
+"""
+
+import random
+from pathlib import Path
+
+FIXTURE_DIR = Path(__file__).parent / 'fixtures'
+
+# Sizes that are checked in; larger pages are generated on demand
+CHECKED_IN_SIZES = (30, 300)
+DEFAULT_SIZES = (30, 300, 1000, 3000)
+
+RANKS = ['SS+', 'SS', 'S+', 'S', 'A+', 'A', 'B+', 'B']
+LOGINS = ['Online', '5 minutes ago', '1 hour ago', '3 hours ago', '1 day ago', '4 days ago']
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{club} - Club Profile | Chronogenesis</title>
+<link rel="stylesheet" href="/static/css/main.css">
+<script src="/static/js/vendor.js"></script>
+<script>window.__CONFIG__ = {{"circle_id": "{club}", "theme": "dark"}};</script>
+</head>
+<body>
+<nav class="navbar"><ul>{nav}</ul></nav>
+<div class="container">
+<div class="club-header">
+<h1 class="club-name">{club}</h1>
+<div class="club-stats">{stats}</div>
+</div>
+<table class="club-member-table">
+<thead><tr><th>Trainer</th><th>Fans</th><th>30-day Avg</th><th>Last Login</th></tr></thead>
+<tbody>
+{rows}
+</tbody>
+</table>
+<div class="footer-links">{footer}</div>
+</div>
+</body>
+</html>
+"""
+
+ROW_TEMPLATE = """<tr class="club-member-row-container{role_class}">
+<td><div class="club-profile-cell"><img class="club-profile-icon" src="/img/chara/{icon}.png">
+<span class="club-profile-rank-eval">{rank}</span><div class="club-profile-text">
+<span class="club-profile-name">{name}</span><span class="club-profile-fid">{fid}</span></div></div></td>
+<td><span class="club-profile-cell-reg-span">{fans:,}</span><br><span class="{change_class}">{change}</span></td>
+<td><span class="club-profile-cell-reg-span">{avg:,}</span></td>
+<td><span class="club-profile-cell-reg-span">{login}</span></td>
+</tr>"""
+
+
+def make_member_rows(n_members, seed=0):
+    """Deterministic member records: (role, rank, name, fid, fans, change, avg, login)"""
+    rng = random.Random(seed)
+    members = []
+    for i in range(n_members):
+        role = 'Leader' if i == 0 else 'Officer' if i < 3 else 'Member'
+        change = rng.choice([0, rng.randint(1, 3_000_000), -rng.randint(1, 50_000)])
+        members.append({
+            'role': role,
+            'rank': rng.choice(RANKS),
+            'name': f"Trainer{i:05d}",
+            'fid': str(100_000_000_000 + rng.randint(0, 899_999_999_999)),
+            'fans': rng.randint(1_000_000, 400_000_000),
+            'change': change,
+            'avg': rng.randint(0, 2_000_000),
+            'login': rng.choice(LOGINS),
+        })
+    return members
+
+
+def make_club_page(n_members, club='Uchoom', seed=0):
+    """Full club_profile page HTML with n_members rows"""
+    rows = []
+    for i, m in enumerate(make_member_rows(n_members, seed)):
+        role_class = {'Leader': ' leader', 'Officer': ' sub-leader'}.get(m['role'], '')
+        if m['change'] > 0:
+            change_class, change = 'club-profile-positive', f"+{m['change']:,}"
+        elif m['change'] < 0:
+            change_class, change = 'club-profile-negative', f"{m['change']:,}"
+        else:
+            change_class, change = 'club-profile-neutral', ''
+        rows.append(ROW_TEMPLATE.format(
+            role_class=role_class, icon=1000 + i % 90, rank=m['rank'], name=m['name'],
+            fid=m['fid'], fans=m['fans'], change_class=change_class, change=change,
+            avg=m['avg'], login=m['login']))
+
+    return PAGE_TEMPLATE.format(
+        club=club,
+        nav=''.join(f'<li><a href="/page{i}">Link {i}</a></li>' for i in range(40)),
+        stats=''.join(f'<span class="club-stat">Stat {i}: {i * 1234:,}</span>' for i in range(20)),
+        rows='\n'.join(rows),
+        footer=''.join(f'<a href="/footer{i}">Footer {i}</a>' for i in range(30)))
+
+
+def edge_case_pages():
+    """
+    (label, html, member rows) for inputs the backends must also agree on:
+    a blank page, and a page str that starts with an XML encoding
+    declaration (which lxml refuses as str) and holds non-ASCII names
+    """
+    declared = ('<?xml version="1.0" encoding="iso-8859-1"?>\n'
+                + make_club_page(30).replace('Trainer00001', 'Tränér☃'))
+    return [('empty', '', 0), ('xml-decl', declared, 30)]
+
+
+def fixture_path(n_members):
+    return FIXTURE_DIR / f'club_profile_{n_members}.html'
+
+
+def load_fixture(n_members):
+    """Read a saved fixture page, generating (and saving) it if missing"""
+    path = fixture_path(n_members)
+    if not path.exists():
+        FIXTURE_DIR.mkdir(exist_ok=True)
+        path.write_text(make_club_page(n_members), encoding='utf-8')
+    return path.read_text(encoding='utf-8')
+
+
+if __name__ == '__main__':
+    for size in CHECKED_IN_SIZES:
+        fixture_path(size).write_text(make_club_page(size), encoding='utf-8')
+        print(f"💾 Wrote {fixture_path(size)}")
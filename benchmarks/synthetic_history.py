@@ -0,0 +1,130 @@
+"""
+Synthetic multi-year club histories for database benchmarks
+Replays years of daily (and the odd manual) scrapes across several clubs
+through DatabaseManager.save_snapshot, with members leaving and being
+replaced, and renaming themselves, so rollups, name history and the
+snapshot table look like a long-running bot's.
+
+Usage: python benchmarks/synthetic_history.py out.db [--members 30] [--clubs 3] [--days 1095]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+
+SYLLABLES = ['ka', 'ri', 'mo', 'su', 'ne', 'to', 'ya', 'hi', 'ro', 'mi', 'zu', 'ta',
+             'no', 'ki', 'sa', 'ra', 'chi', 'ko', 'me', 'shi']
+
+
+class SyntheticClub:
+    """A club roster whose fans, members and names evolve day by day"""
+
+    def __init__(self, name, members, rng):
+        self.name = name
+        self.rng = rng
+        self.members = [self._new_member() for _ in range(members)]
+
+    def _new_member(self):
+        rng = self.rng
+        return {
+            'id': str(rng.randint(100_000_000_000, 999_999_999_999)),
+            'name': self._new_name(),
+            'fans': rng.randint(1_000_000, 80_000_000),
+            # Typical daily gain; some members barely play
+            'pace': rng.choice([0, 50_000, 300_000, 500_000, 800_000, 1_500_000]),
+            'gain': 0,
+        }
+
+    def _new_name(self):
+        return ''.join(self.rng.choice(SYLLABLES) for _ in range(self.rng.randint(2, 4))).title()
+
+    def new_day(self, churn, renames):
+        """Departures (replaced by newcomers), renames and the daily gain reset"""
+        rng = self.rng
+        for i, member in enumerate(self.members):
+            if rng.random() < churn / 30:
+                self.members[i] = member = self._new_member()
+            elif rng.random() < renames / 30:
+                member['name'] = self._new_name()
+            member['gain'] = 0
+
+    def scrape(self, share):
+        """Advance everyone by `share` of a day's play; return the normalized members"""
+        rng = self.rng
+        for member in self.members:
+            if member['pace']:
+                gain = int(rng.uniform(0, 2) * member['pace'] * share)
+                member['fans'] += gain
+                member['gain'] += gain
+        return [{'id': m['id'], 'name': m['name'], 'fans': m['fans'], 'gain': m['gain']}
+                for m in self.members]
+
+
+def generate(db, members=30, clubs=1, days=365, scrapes_per_day=1.2, churn=0.05,
+             renames=0.02, seed=0, end=None):
+    """
+    Fill `db` with `days` of history up to `end` (default now) for `clubs`
+    clubs of `members` each. scrapes_per_day >= 1: the fraction above one is
+    the chance of an extra manual scrape that day. churn and renames are the
+    monthly share of members leaving (replaced by newcomers) and renaming.
+    Returns the number of snapshot rows written.
+    """
+    rng = random.Random(seed)
+    end = end or datetime.now()
+    first_day = (end - timedelta(days=days - 1)).replace(hour=8, minute=0, second=0, microsecond=0)
+    roster = [SyntheticClub(f"Club{i:02d}", members, rng) for i in range(clubs)]
+
+    rows = 0
+    for day in range(days):
+        morning = first_day + timedelta(days=day)
+        extra = int(scrapes_per_day - 1) + (rng.random() < (scrapes_per_day - 1) % 1)
+        times = [morning] + sorted(morning + timedelta(minutes=rng.randint(30, 14 * 60))
+                                   for _ in range(extra))
+        for club_index, club in enumerate(roster):
+            club.new_day(churn, renames)
+            for when in times:
+                # Each club's daily job is staggered a few minutes after the previous one
+                when = when + timedelta(minutes=5 * club_index)
+                if when > end:
+                    break
+                share = 1 / len(times)
+                data = club.scrape(share)
+                db.save_snapshot(data, club=club.name, when=when)
+                rows += len(data)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('path', help='Database file to create (must not exist)')
+    parser.add_argument('--members', type=int, default=30, help='Members per club')
+    parser.add_argument('--clubs', type=int, default=1)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--scrapes-per-day', type=float, default=1.2)
+    parser.add_argument('--churn', type=float, default=0.05, help='Monthly share of members replaced')
+    parser.add_argument('--renames', type=float, default=0.02, help='Monthly share of members renaming')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    path = os.path.abspath(args.path)
+    if os.path.exists(path):
+        sys.exit(f"❌ {path} already exists")
+    started = time.perf_counter()
+    db = DatabaseManager(path)
+    rows = generate(db, args.members, args.clubs, args.days, args.scrapes_per_day,
+                    args.churn, args.renames, args.seed)
+    db.maintain()
+    db.conn.close()
+    print(f"💾 Wrote {rows:,} snapshot rows to {path} in {time.perf_counter() - started:.1f}s "
+          f"({os.path.getsize(path) / 2**20:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+"""
+Long-lived browser session for the club scraper
+Keeps one Chrome instance warm between scrapes so Cloudflare clearance survives
+"""
+
+import asyncio
+import time
+from pathlib import Path
+import nodriver as uc
+from browser_profile import launch_options
+
+
+class BrowserManager:
+    """
+    Owns a single nodriver browser and a bounded pool of tabs.
+    Each scrape borrows one tab; at most max_tabs scrapes run at once.
+    The Chrome profile and cookies live on disk so a restart skips the challenge.
+    """
+
+    def __init__(self, profile_dir='browser_profile', browser_profile='desktop',
+                 max_idle=3600, health_timeout=5, max_tabs=1):
+        self.profile_dir = Path(profile_dir)
+        self.cookie_file = self.profile_dir / 'cookies.dat'
+        # Launch profile name from browser_profile.BROWSER_PROFILES
+        self.browser_profile = browser_profile
+        self.max_idle = max_idle
+        self.health_timeout = health_timeout
+        self.max_tabs = max_tabs
+
+        self.browser = None
+        self.last_used = 0.0
+        self.launches = 0
+        self._idle_tabs = []
+        self._in_use = 0
+        self._slots = asyncio.Semaphore(max_tabs)
+        # Guards launch/shutdown and the tab bookkeeping
+        self._lock = asyncio.Lock()
+
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+
+    async def acquire(self):
+        """Borrow a healthy tab, (re)launching the browser only when needed"""
+        await self._slots.acquire()
+        try:
+            async with self._lock:
+                if self._needs_relaunch():
+                    await self._shutdown()
+                    await self._launch()
+                tab = await self._checkout_tab()
+                self._in_use += 1
+                self.last_used = time.monotonic()
+                return tab
+        except Exception:
+            self._slots.release()
+            raise
+
+    async def release(self, tab, healthy=True):
+        """Return a tab to the pool, persisting cookies once the pool is quiet"""
+        try:
+            async with self._lock:
+                self._in_use -= 1
+                self.last_used = time.monotonic()
+                if healthy and self.browser and getattr(tab, 'browser', self.browser) is self.browser:
+                    self._idle_tabs.append(tab)
+                else:
+                    await self._close_tab(tab)
+                if self._in_use == 0:
+                    await self._save_cookies()
+        finally:
+            self._slots.release()
+
+    async def close(self):
+        """Persist cookies and stop the browser for good"""
+        async with self._lock:
+            await self._save_cookies()
+            await self._shutdown()
+
+    def _needs_relaunch(self):
+        if not self.browser:
+            return True
+        if getattr(self.browser, 'stopped', False):
+            print("⚠️ Browser process has exited, relaunching...")
+            return True
+        idle = self._in_use == 0 and time.monotonic() - self.last_used > self.max_idle
+        if self.max_idle and idle:
+            print("💤 Browser idle for too long, relaunching...")
+            return True
+        return False
+
+    async def _checkout_tab(self):
+        while self._idle_tabs:
+            tab = self._idle_tabs.pop()
+            if await self._is_healthy(tab):
+                print("♻️ Reusing warm browser tab")
+                return tab
+            if self._in_use == 0:
+                # Nothing else is using the browser, so a hard restart is safe
+                print("⚠️ Browser tab unresponsive, relaunching...")
+                await self._shutdown()
+                await self._launch()
+                return self._idle_tabs.pop()
+            print("⚠️ Browser tab unresponsive, discarding it...")
+            await self._close_tab(tab)
+
+        return await self.browser.get('about:blank', new_tab=True)
+
+    async def _is_healthy(self, tab):
+        try:
+            result = await asyncio.wait_for(
+                tab.evaluate('1 + 1', return_by_value=True), timeout=self.health_timeout)
+        except Exception:
+            return False
+        return result == 2
+
+    async def _launch(self):
+        print(f"🚀 Launching persistent browser session ({self.browser_profile})...")
+        self.browser = await uc.start(
+            user_data_dir=str(self.profile_dir / 'chrome'),
+            **launch_options(self.browser_profile))
+        await self._load_cookies()
+        self._idle_tabs = [await self.browser.get('about:blank')]
+        self.launches += 1
+        print(f"✅ Browser ready (launch #{self.launches})")
+
+    async def _shutdown(self):
+        self._idle_tabs = []
+        if not self.browser:
+            return
+        try:
+            stopped = self.browser.stop()
+            if asyncio.iscoroutine(stopped):
+                await stopped
+            await asyncio.sleep(0.5)
+        except Exception:
+            # Suppress cleanup warnings - they're harmless
+            pass
+        self.browser = None
+
+    async def _close_tab(self, tab):
+        try:
+            await tab.close()
+        except Exception:
+            pass
+
+    async def _load_cookies(self):
+        if not self.cookie_file.exists():
+            return
+        try:
+            await self.browser.cookies.load(str(self.cookie_file))
+            print("🍪 Restored saved cookies")
+        except Exception as e:
+            print(f"⚠️ Could not restore cookies: {e}")
+
+    async def _save_cookies(self):
+        if not self.browser or getattr(self.browser, 'stopped', False):
+            return
+        try:
+            await self.browser.cookies.save(str(self.cookie_file))
+        except Exception as e:
+            print(f"⚠️ Could not save cookies: {e}")
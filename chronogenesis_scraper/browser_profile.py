@@ -0,0 +1,118 @@
+"""
+Browser launch profiles and resource measurement
+Lets the bot trade the desktop Chrome window for a lean headless instance and
+reports what the browser process tree actually costs per scrape
+"""
+
+import asyncio
+
+try:
+    import psutil
+except ImportError:  # measurement is optional, scraping is not
+    psutil = None
+
+
+# Flags that keep a headless Chrome small on a shared 1 GB box
+LOW_MEMORY_ARGS = [
+    '--disable-gpu',
+    '--disable-software-rasterizer',
+    '--disable-extensions',
+    '--disable-component-extensions-with-background-pages',
+    '--disable-background-networking',
+    '--disable-default-apps',
+    '--disable-sync',
+    '--metrics-recording-only',
+    '--mute-audio',
+    '--renderer-process-limit=2',
+    '--disk-cache-size=33554432',
+    '--js-flags=--max-old-space-size=256',
+]
+
+# Named profiles selectable via BROWSER_PROFILE
+BROWSER_PROFILES = {
+    # Full GUI Chrome, the original behaviour (needs a display)
+    'desktop': {'headless': False, 'args': []},
+    # Chrome's new headless mode, otherwise stock
+    'headless': {'headless': True, 'args': ['--disable-gpu']},
+    # New headless plus every memory-saving flag above
+    'lowmem': {'headless': True, 'args': LOW_MEMORY_ARGS},
+}
+
+
+def launch_options(profile_name):
+    """Keyword arguments for nodriver.start() for a named profile"""
+    profile = BROWSER_PROFILES.get(profile_name)
+    if profile is None:
+        print(f"⚠️ Unknown browser profile '{profile_name}', using 'desktop'")
+        profile = BROWSER_PROFILES['desktop']
+    return {'headless': profile['headless'], 'browser_args': list(profile['args'])}
+
+
+def browser_pid(browser):
+    """PID of the Chrome main process behind a nodriver Browser"""
+    return getattr(browser, '_process_pid', None) if browser else None
+
+
+class ProcessTreeMonitor:
+    """
+    Samples RSS of a process and all its children while a scrape runs.
+    Reports peak RSS and the CPU time the tree spent during the window.
+    """
+
+    def __init__(self, pid, interval=0.5):
+        self.pid = pid
+        self.interval = interval
+        self.peak_rss = 0
+        self._cpu_start = {}
+        self._cpu_last = {}
+        self._task = None
+
+    async def start(self):
+        if psutil is None or not self.pid:
+            return
+        self._sample(baseline=True)
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        """Stop sampling and return the measurements (empty if unavailable)"""
+        if not self._task:
+            return {}
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._sample()
+
+        cpu = sum(last - self._cpu_start.get(pid, 0.0) for pid, last in self._cpu_last.items())
+        return {
+            'peak_rss_mb': round(self.peak_rss / 2**20, 1),
+            'cpu_seconds': round(cpu, 2),
+            'processes': len(self._cpu_last),
+        }
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            self._sample()
+
+    def _sample(self, baseline=False):
+        try:
+            root = psutil.Process(self.pid)
+            procs = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return
+
+        rss = 0
+        for proc in procs:
+            try:
+                with proc.oneshot():
+                    rss += proc.memory_info().rss
+                    times = proc.cpu_times()
+            except psutil.Error:
+                continue
+            cpu = times.user + times.system
+            if baseline:
+                self._cpu_start[proc.pid] = cpu
+            self._cpu_last[proc.pid] = cpu
+        self.peak_rss = max(self.peak_rss, rss)
@@ -14,6 +14,7 @@ async def main():
     # ... (rest of your original code)
     scraper = ChrononesisClubScraper(output_dir='output')
     await scraper.scrape_club('Uchoom')
+    await scraper.flush_exports()
     print("Done")
 
 if __name__ == "__main__":
@@ -0,0 +1,180 @@
+"""
+CDP network capture for chronogenesis.net
+Grabs the club member JSON payload as it arrives, so the DOM never has to render
+"""
+
+import asyncio
+import base64
+import json
+import re
+import nodriver as uc
+
+cdp = uc.cdp
+
+# Responses worth inspecting: XHR/fetch JSON whose URL mentions the club
+DEFAULT_URL_PATTERN = r'(club|circle)'
+
+# Candidate JSON keys for every field produced by parse_member_table
+FIELD_KEYS = {
+    'rank': ('rank', 'rank_eval', 'rank_score', 'team_evaluation'),
+    'name': ('name', 'trainer_name', 'viewer_name', 'user_name'),
+    'friend_id': ('friend_id', 'viewer_id', 'fid', 'user_id'),
+    'role': ('role', 'membership', 'position'),
+    'total_fans': ('total_fans', 'fan_count', 'fans', 'total_fan'),
+    'fan_change': ('fan_change', 'fan_gain', 'daily_gain', 'gain'),
+    'daily_avg': ('daily_avg', 'avg_fans', 'fan_avg', 'daily_average'),
+    'last_login': ('last_login', 'last_login_time', 'login_time'),
+}
+
+
+def schedule_cdp(coro):
+    """
+    Run CDP work started from an event handler as its own task. nodriver
+    calls handlers from the tab's listener loop, which also delivers CDP
+    responses, so a handler that awaited a CDP command itself would block the
+    loop its answer arrives on. Handlers schedule through here and return.
+    """
+    return asyncio.ensure_future(coro)
+
+
+class NetworkCapture:
+    """
+    Listens to Network events on a tab and resolves with the first response
+    that parses into member dicts.
+    """
+
+    def __init__(self, tab, url_pattern=DEFAULT_URL_PATTERN):
+        self.tab = tab
+        self.url_pattern = re.compile(url_pattern, re.IGNORECASE)
+        self.url = None
+        self.payload_size = 0
+        self.body = None
+        self._candidates = {}
+        self._result = None
+
+    async def start(self):
+        self._result = asyncio.get_running_loop().create_future()
+        self.tab.add_handler(cdp.network.ResponseReceived, self._on_response)
+        self.tab.add_handler(cdp.network.LoadingFinished, self._on_finished)
+        await self.tab.send(cdp.network.enable())
+
+    def stop(self):
+        try:
+            self.tab.remove_handler(cdp.network.ResponseReceived, self._on_response)
+            self.tab.remove_handler(cdp.network.LoadingFinished, self._on_finished)
+        except Exception:
+            pass
+        if self._result and not self._result.done():
+            self._result.cancel()
+
+    async def wait(self, timeout):
+        """Member list from the network, or None if nothing usable arrived in time"""
+        try:
+            return await asyncio.wait_for(asyncio.shield(self._result), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            return None
+
+    def _on_response(self, event):
+        response = event.response
+        if event.type_ not in (cdp.network.ResourceType.XHR, cdp.network.ResourceType.FETCH):
+            return
+        if 'json' not in (response.mime_type or ''):
+            return
+        if self.url_pattern.search(response.url):
+            self._candidates[event.request_id] = response.url
+
+    def _on_finished(self, event):
+        if event.request_id in self._candidates and not self._result.done():
+            schedule_cdp(self._read_body(event.request_id))
+
+    async def _read_body(self, request_id):
+        try:
+            body, is_base64 = await self.tab.send(cdp.network.get_response_body(request_id))
+            if is_base64:
+                body = base64.b64decode(body).decode('utf-8', errors='replace')
+            members = parse_member_payload(json.loads(body))
+        except Exception:
+            return
+
+        if members and not self._result.done():
+            self.url = self._candidates[request_id]
+            self.payload_size = len(body)
+            self.body = body
+            self._result.set_result(members)
+
+
+def parse_member_payload(payload):
+    """Turn a JSON payload into the same member dicts as parse_member_table"""
+    rows = _find_member_rows(payload)
+    if not rows:
+        return []
+
+    members = []
+    for row in rows:
+        total_fans = _pick(row, 'total_fans')
+        fan_change = _pick(row, 'fan_change')
+        daily_avg = _pick(row, 'daily_avg')
+
+        members.append({
+            'rank': _text(_pick(row, 'rank')),
+            'name': _text(_pick(row, 'name')),
+            'friend_id': _text(_pick(row, 'friend_id')),
+            'role': _role(_pick(row, 'role')),
+            'total_fans': _number(total_fans),
+            'fan_change': _signed(fan_change) if fan_change is not None else '0',
+            'daily_avg': _number(daily_avg),
+            'last_login': _text(_pick(row, 'last_login')),
+        })
+    return members
+
+
+def _find_member_rows(node):
+    """Depth-first search for the first list of dicts that look like members"""
+    if isinstance(node, list):
+        if node and all(isinstance(item, dict) for item in node):
+            if all(_pick(item, 'name') is not None and _pick(item, 'friend_id') is not None
+                   for item in node):
+                return node
+        children = node
+    elif isinstance(node, dict):
+        children = node.values()
+    else:
+        return None
+
+    for child in children:
+        rows = _find_member_rows(child)
+        if rows:
+            return rows
+    return None
+
+
+def _pick(row, field):
+    for key in FIELD_KEYS[field]:
+        if row.get(key) is not None:
+            return row[key]
+    return None
+
+
+def _text(value):
+    return str(value).strip() if value is not None else 'N/A'
+
+
+def _number(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f"{int(value):,}"
+    return _text(value)
+
+
+def _signed(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f"+{int(value):,}" if value > 0 else f"{int(value):,}"
+    return _text(value)
+
+
+def _role(value):
+    text = str(value).lower() if value is not None else ''
+    if 'sub' in text or 'officer' in text:
+        return 'Officer'
+    if 'leader' in text:
+        return 'Leader'
+    return 'Member'
@@ -0,0 +1,109 @@
+"""
+Compressed, content-addressed archive of every fetched club page
+Each distinct page is stored once under objects/, gzip-compressed and named
+by its hash; index.jsonl records every fetch (club, time, hash) so history
+can be re-parsed later (reparse_archive.py) instead of scraped again.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+
+# What was fetched: the rendered page or the member JSON from the network
+KINDS = {'html': '.html.gz', 'json': '.json.gz'}
+
+
+def page_hash(content):
+    """Content address of a page (hex blake2b of its UTF-8 bytes)"""
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+class PageArchive:
+    """
+    objects/<2 hex>/<hash>.<kind>.gz plus an append-only index.jsonl.
+    One instance serves every club of a process (ScrapeRunner shares it), so
+    its lock keeps index lines whole. Page files need no lock: each write
+    goes to its own temp file and is renamed into place, so writers of the
+    same page (even from other instances) just replace identical bytes and
+    a crash never leaves a truncated page behind.
+    """
+
+    def __init__(self, root, compresslevel=6):
+        self.root = Path(root)
+        self.objects = self.root / 'objects'
+        self.index_path = self.root / 'index.jsonl'
+        self.compresslevel = compresslevel
+        self.objects.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def object_path(self, digest, kind='html'):
+        return self.objects / digest[:2] / f"{digest}{KINDS[kind]}"
+
+    def store(self, club, content, kind='html', fetched_at=None):
+        """Archive one fetch (blocking); returns (hash, True if the page was new)"""
+        raw = content.encode('utf-8')
+        digest = page_hash(raw)
+        path = self.object_path(digest, kind)
+        new = not path.exists()
+        if new:
+            path.parent.mkdir(exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            # mtime=0: identical pages compress to identical files
+            tmp.write_bytes(gzip.compress(raw, self.compresslevel, mtime=0))
+            os.replace(tmp, path)
+
+        entry = {
+            'club': club,
+            'fetched_at': (fetched_at or datetime.now()).isoformat(),
+            'kind': kind,
+            'hash': digest,
+            'bytes': len(raw),
+        }
+        with self._lock, open(self.index_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+        return digest, new
+
+    def load(self, digest, kind='html'):
+        """The archived page as text"""
+        return gzip.decompress(self.object_path(digest, kind).read_bytes()).decode('utf-8')
+
+    def entries(self, clubs=None, since=None, until=None):
+        """
+        Index entries sorted by fetch time, optionally limited to `clubs` and
+        to fetches in [since, until) (datetimes). Torn last lines are skipped.
+        """
+        if not self.index_path.exists():
+            return []
+        entries = []
+        with open(self.index_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    entry['fetched_at'] = datetime.fromisoformat(entry['fetched_at'])
+                except (ValueError, KeyError):
+                    continue
+                if clubs and entry['club'] not in clubs:
+                    continue
+                if since and entry['fetched_at'] < since:
+                    continue
+                if until and entry['fetched_at'] >= until:
+                    continue
+                entries.append(entry)
+        entries.sort(key=lambda entry: entry['fetched_at'])
+        return entries
+
+    def stats(self):
+        """Fetches indexed, distinct pages and their size raw vs. on disk"""
+        fetches, pages, raw_bytes = 0, {}, 0
+        for entry in self.entries():
+            fetches += 1
+            raw_bytes += entry['bytes']
+            pages[(entry['hash'], entry['kind'])] = entry['bytes']
+        stored = sum(self.object_path(digest, kind).stat().st_size
+                     for digest, kind in pages if self.object_path(digest, kind).exists())
+        return {'fetches': fetches, 'pages': len(pages), 'fetched_bytes': raw_bytes,
+                'unique_bytes': sum(pages.values()), 'stored_bytes': stored}
@@ -0,0 +1,137 @@
+"""
+Alternative member-table parsers
+Each backend builds only what it needs and returns the same member dicts as
+ChrononesisClubScraper.parse_member_table
+"""
+
+# Backends understood by ChrononesisClubScraper(parser=...)
+# 'bs4' and 'strainer' go through parse_member_table; the rest live here
+PARSER_BACKENDS = ('bs4', 'strainer', 'lxml', 'selectolax')
+
+
+def parse_members(html_content, backend):
+    """Parse the member table with lxml or selectolax"""
+    if backend == 'lxml':
+        return _parse_lxml(html_content)
+    if backend == 'selectolax':
+        return _parse_selectolax(html_content)
+    raise ValueError(f"Unknown parser backend: {backend}")
+
+
+def backend_available(backend):
+    """True if the optional library behind a backend is installed"""
+    modules = {'bs4': 'bs4', 'strainer': 'bs4',
+               'lxml': 'lxml.html', 'selectolax': 'selectolax.lexbor'}
+    try:
+        __import__(modules[backend])
+    except (ImportError, KeyError):
+        return False
+    return True
+
+
+def _member(role, rank, name, fid, total_fans, fan_change, daily_avg, last_login):
+    return {
+        'rank': rank if rank is not None else 'N/A',
+        'name': name if name is not None else 'N/A',
+        'friend_id': fid if fid is not None else 'N/A',
+        'role': role,
+        'total_fans': total_fans if total_fans is not None else 'N/A',
+        'fan_change': fan_change if fan_change is not None else '0',
+        'daily_avg': daily_avg if daily_avg is not None else 'N/A',
+        'last_login': last_login if last_login is not None else 'N/A'
+    }
+
+
+def _role_from_classes(classes):
+    if 'leader' in classes:
+        return 'Leader'
+    if 'sub-leader' in classes:
+        return 'Officer'
+    return 'Member'
+
+
+# ===== lxml =====
+
+def _xclass(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def _parse_lxml(html_content):
+    import lxml.etree
+    import lxml.html
+
+    # Like the other backends, a page without a table is [] rather than an
+    # error: lxml rejects empty documents, and str input that starts with an
+    # XML encoding declaration, so it gets UTF-8 bytes with the encoding pinned
+    if not html_content.strip():
+        return []
+    parser = lxml.html.HTMLParser(encoding='utf-8')
+    try:
+        root = lxml.html.fromstring(html_content.encode('utf-8'), parser=parser)
+    except lxml.etree.ParserError:
+        return []
+    tables = root.xpath(f"//table[{_xclass('club-member-table')}]")
+    if not tables:
+        return []
+    tbodies = tables[0].xpath('.//tbody')
+    if not tbodies:
+        return []
+
+    def first_text(cell, xpath):
+        found = cell.xpath(xpath)
+        return found[0].text_content().strip() if found else None
+
+    rank_xp = f".//span[{_xclass('club-profile-rank-eval')}]"
+    name_xp = f".//span[{_xclass('club-profile-name')}]"
+    fid_xp = f".//span[{_xclass('club-profile-fid')}]"
+    reg_xp = f".//span[{_xclass('club-profile-cell-reg-span')}]"
+    change_xp = f".//span[{_xclass('club-profile-positive')} or {_xclass('club-profile-negative')}]"
+
+    members = []
+    for row in tbodies[0].xpath(f".//tr[{_xclass('club-member-row-container')}]"):
+        cells = row.xpath('.//td')
+        if len(cells) < 4:
+            continue
+        members.append(_member(
+            _role_from_classes((row.get('class') or '').split()),
+            first_text(cells[0], rank_xp),
+            first_text(cells[0], name_xp),
+            first_text(cells[0], fid_xp),
+            first_text(cells[1], reg_xp),
+            first_text(cells[1], change_xp),
+            first_text(cells[2], reg_xp),
+            first_text(cells[3], reg_xp)))
+    return members
+
+
+# ===== selectolax =====
+
+def _parse_selectolax(html_content):
+    from selectolax.lexbor import LexborHTMLParser
+
+    table = LexborHTMLParser(html_content).css_first('table.club-member-table')
+    if table is None:
+        return []
+    tbody = table.css_first('tbody')
+    if tbody is None:
+        return []
+
+    def first_text(cell, selector):
+        found = cell.css_first(selector)
+        return found.text(deep=True).strip() if found is not None else None
+
+    members = []
+    for row in tbody.css('tr.club-member-row-container'):
+        cells = row.css('td')
+        if len(cells) < 4:
+            continue
+        members.append(_member(
+            _role_from_classes((row.attributes.get('class') or '').split()),
+            first_text(cells[0], 'span.club-profile-rank-eval'),
+            first_text(cells[0], 'span.club-profile-name'),
+            first_text(cells[0], 'span.club-profile-fid'),
+            first_text(cells[1], 'span.club-profile-cell-reg-span'),
+            first_text(cells[1], 'span.club-profile-positive, span.club-profile-negative'),
+            first_text(cells[2], 'span.club-profile-cell-reg-span'),
+            first_text(cells[3], 'span.club-profile-cell-reg-span')))
+    return members
@@ -0,0 +1,143 @@
+"""
+CDP request interception for the scraping tab
+Denies images, fonts, ads and analytics so only what the member table needs is loaded
+"""
+
+from collections import Counter
+from fnmatch import fnmatch
+import nodriver as uc
+from network_capture import schedule_cdp
+
+cdp = uc.cdp
+
+# Never block these: Cloudflare's challenge and the site itself must load
+ALWAYS_ALLOW = (
+    '*challenges.cloudflare.com*',
+    '*/cdn-cgi/*',
+)
+
+AD_AND_ANALYTICS_URLS = (
+    '*googletagmanager.com*',
+    '*google-analytics.com*',
+    '*googlesyndication.com*',
+    '*doubleclick.net*',
+    '*adservice.google.*',
+    '*amazon-adsystem.com*',
+    '*nitropay.com*',
+    '*connect.facebook.net*',
+    '*static.cloudflareinsights.com*',
+    '*clarity.ms*',
+    '*hotjar.com*',
+)
+
+# Named profiles selectable via ChrononesisClubScraper(block_profile=...)
+BLOCK_PROFILES = {
+    'off': None,
+    'default': {
+        'types': ('Image', 'Font', 'Media'),
+        'urls': AD_AND_ANALYTICS_URLS,
+    },
+    'strict': {
+        'types': ('Image', 'Font', 'Media', 'Stylesheet', 'Manifest', 'TextTrack', 'Ping'),
+        'urls': AD_AND_ANALYTICS_URLS,
+    },
+}
+
+# Typical transfer sizes, used to estimate what a blocked request would have cost
+ESTIMATED_BYTES = {
+    'Image': 40_000,
+    'Font': 60_000,
+    'Media': 500_000,
+    'Stylesheet': 30_000,
+    'Script': 80_000,
+}
+DEFAULT_ESTIMATE = 10_000
+
+
+class RequestFilter:
+    """
+    Pauses matching requests through the Fetch domain and fails the ones the
+    profile denies. Counts blocked requests and received bytes per scrape.
+    """
+
+    def __init__(self, block_types=(), block_urls=(), allow_urls=ALWAYS_ALLOW):
+        self.block_types = tuple(block_types)
+        self.block_urls = tuple(block_urls)
+        self.allow_urls = tuple(allow_urls)
+        self.tab = None
+        self.blocked = Counter()
+        self.bytes_saved = 0
+        self.bytes_received = 0
+        self.requests_allowed = 0
+
+    @classmethod
+    def from_profile(cls, name):
+        """RequestFilter for a named profile, or None if filtering is off"""
+        profile = BLOCK_PROFILES.get(name)
+        if not profile:
+            return None
+        return cls(block_types=profile['types'], block_urls=profile['urls'])
+
+    async def attach(self, tab):
+        self.tab = tab
+        stage = cdp.fetch.RequestStage.REQUEST
+        patterns = [cdp.fetch.RequestPattern(resource_type=cdp.network.ResourceType(t), request_stage=stage)
+                    for t in self.block_types]
+        patterns += [cdp.fetch.RequestPattern(url_pattern=u, request_stage=stage)
+                     for u in self.block_urls]
+
+        tab.add_handler(cdp.fetch.RequestPaused, self._on_paused)
+        tab.add_handler(cdp.network.LoadingFinished, self._on_finished)
+        await tab.send(cdp.network.enable())
+        await tab.send(cdp.fetch.enable(patterns=patterns))
+
+    async def detach(self):
+        if not self.tab:
+            return
+        try:
+            self.tab.remove_handler(cdp.fetch.RequestPaused, self._on_paused)
+            self.tab.remove_handler(cdp.network.LoadingFinished, self._on_finished)
+            await self.tab.send(cdp.fetch.disable())
+        except Exception:
+            pass
+        self.tab = None
+
+    def stats(self):
+        return {
+            'blocked_requests': sum(self.blocked.values()),
+            'blocked_by_type': dict(self.blocked),
+            'est_bytes_saved': self.bytes_saved,
+            'bytes_received': self.bytes_received,
+        }
+
+    def _on_paused(self, event):
+        schedule_cdp(self._decide(event))  # see schedule_cdp for why
+
+    def _on_finished(self, event):
+        self.bytes_received += int(event.encoded_data_length or 0)
+
+    async def _decide(self, event):
+        url = event.request.url
+        resource_type = event.resource_type.value if event.resource_type else 'Other'
+        try:
+            if self._denied(url, resource_type):
+                self.blocked[resource_type] += 1
+                self.bytes_saved += ESTIMATED_BYTES.get(resource_type, DEFAULT_ESTIMATE)
+                await self.tab.send(cdp.fetch.fail_request(
+                    event.request_id, cdp.network.ErrorReason.BLOCKED_BY_CLIENT))
+            else:
+                self.requests_allowed += 1
+                await self.tab.send(cdp.fetch.continue_request(event.request_id))
+        except Exception:
+            # A paused request must always be answered or the page stalls
+            try:
+                await self.tab.send(cdp.fetch.continue_request(event.request_id))
+            except Exception:
+                pass
+
+    def _denied(self, url, resource_type):
+        if any(fnmatch(url, pattern) for pattern in self.allow_urls):
+            return False
+        if resource_type in self.block_types:
+            return True
+        return any(fnmatch(url, pattern) for pattern in self.block_urls)
@@ -5,12 +5,35 @@ Extracts member data from Uma Musume club profiles
 
 import asyncio
 import os
+import time
 from pathlib import Path
 import nodriver as uc
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import json
-import pandas as pd
+import csv
 from datetime import datetime
+from network_capture import NetworkCapture, DEFAULT_URL_PATTERN
+from parsers import parse_members, backend_available
+from page_archive import PageArchive
+from request_filter import RequestFilter
+from browser_profile import ProcessTreeMonitor, browser_pid, launch_options
+
+
+# Page probes used by the readiness detector
+ROW_COUNT_JS = "document.querySelectorAll('table.club-member-table tbody tr').length"
+CLOUDFLARE_PROBE_JS = """
+(() => {
+    const title = document.title || '';
+    return title.includes('Just a moment')
+        || title.includes('Attention Required')
+        || !!document.querySelector(
+            '#challenge-form, #challenge-running, #cf-challenge-running, '
+            + 'iframe[src*="challenges.cloudflare.com"]');
+})()
+"""
+
+# Only the member table is built when parser='strainer'
+MEMBER_TABLE_STRAINER = SoupStrainer('table', class_='club-member-table')
 
 
 class ChrononesisClubScraper:
@@ -18,10 +41,58 @@ class ChrononesisClubScraper:
     Fixed scraper with proper wait strategy for JavaScript-loaded content
     """
 
-    def __init__(self, output_dir='output'):
+    def __init__(self, output_dir='output', readiness='stable',
+                 poll_interval=0.25, stable_window=1.0, browser_manager=None,
+                 extraction='dom', payload_url_pattern=DEFAULT_URL_PATTERN,
+                 payload_timeout=15, parser='lxml', block_profile='default',
+                 browser_profile='desktop', exports=('json', 'csv', 'session'),
+                 base_url='https://chronogenesis.net', archive_dir=None, archive=None):
         self.browser = None
         self.page = None
         self.output_dir = Path(output_dir)
+        # Site root; a local stand-in server in the offline benchmarks
+        self.base_url = base_url.rstrip('/')
+
+        # Optional BrowserManager: when set, scrapes borrow its warm tab
+        # instead of launching and closing Chrome every time
+        self.browser_manager = browser_manager
+
+        # 'dom' renders the page and parses the table, 'network' takes the
+        # member JSON straight from CDP and falls back to the DOM if none arrives
+        self.extraction = extraction
+        self.payload_url_pattern = payload_url_pattern
+        self.payload_timeout = payload_timeout
+
+        # HTML backend: 'bs4' (whole page), 'strainer' (member table only),
+        # 'lxml' or 'selectolax' (optional extras, see parsers.py)
+        if not backend_available(parser):
+            print(f"⚠️ Parser backend '{parser}' unavailable, using 'strainer'")
+            parser = 'strainer'
+        self.parser = parser
+
+        # Request interception profile from request_filter.BLOCK_PROFILES ('off' disables)
+        self.block_profile = block_profile
+
+        # Launch profile for standalone runs (BrowserManager has its own)
+        self.browser_profile = browser_profile
+
+        # File sinks ('json', 'csv', 'session') written in the background after
+        # each scrape; the data itself is returned from scrape_club
+        self.exports = tuple(exports)
+        self._export_tasks = set()
+
+        # Every fetched page (HTML or member JSON) goes to a compressed,
+        # content-addressed archive so history can be re-parsed later.
+        # `archive` shares one PageArchive between engines (ScrapeRunner)
+        self.archive = archive or (PageArchive(archive_dir) if archive_dir else None)
+        self.club = None
+
+        # 'stable' polls the DOM until the row count settles,
+        # 'fixed' keeps the old sleep-based waits
+        self.readiness = readiness
+        self.poll_interval = poll_interval
+        self.stable_window = stable_window
+        self.phase_timings = {}
 
         # Create output directory if it doesn't exist
         self.output_dir.mkdir(exist_ok=True)
@@ -35,8 +106,8 @@ class ChrononesisClubScraper:
 
     async def initialize_browser(self):
         """Launch browser with stealth settings"""
-        print("🚀 Initializing Nodriver browser (stealth mode)...")
-        self.browser = await uc.start(headless=False)
+        print(f"🚀 Initializing Nodriver browser (stealth mode, {self.browser_profile})...")
+        self.browser = await uc.start(**launch_options(self.browser_profile))
         print("✅ Browser initialized")
         return self.browser
 
@@ -57,45 +128,171 @@ class ChrononesisClubScraper:
         print(f"📖 Navigating to {url}...")
 
         try:
+            started = time.perf_counter()
             await self.page.get(url)
+            self.phase_timings['navigation'] = time.perf_counter() - started
             print("⏳ Page shell loaded. Now waiting for JavaScript to render data...")
 
-            # Step 1: Wait for Cloudflare
-            print("   Step 1: Waiting for Cloudflare (3 seconds)...")
-            await asyncio.sleep(3)
-
-            # Step 2: Wait for table to appear with timeout
-            print("   Step 2: Waiting for member table to appear (up to 15 seconds)...")
-            try:
-                await self.page.wait_for_selector('table.club-member-table', timeout=7000)
-                print("   ✅ Table appeared!")
-            except Exception as e:
-                print(f"   ⚠️ Table selector timeout: {e}")
-                print("   Continuing anyway with extra wait...")
-                await asyncio.sleep(10)
-
-            # Step 3: Wait for table rows to populate
-            print("   Step 3: Waiting for rows to populate (up to 10 seconds)...")
-            try:
-                await self.page.wait_for_selector('table.club-member-table tbody tr', timeout=10000)
-                print("   ✅ Member rows appeared!")
-            except Exception as e:
-                print(f"   ⚠️ Rows timeout: {e}")
-                await asyncio.sleep(8)
+            if self.readiness == 'fixed':
+                await self._wait_fixed()
+            else:
+                await self._wait_until_ready(max_wait)
 
-            # Step 4: Extra buffer for all content to render
-            print("   Step 4: Final render buffer (5 seconds)...")
-            await asyncio.sleep(5)
+            print("⏱️ Phase timings: " + ", ".join(
+                f"{phase}={seconds:.2f}s" for phase, seconds in self.phase_timings.items()))
 
             print("✅ Page fully loaded with all data!")
             self.session_data['last_visit'] = datetime.now().isoformat()
             self.session_data['requests_made'] += 1
+            self.session_data['phase_timings'] = dict(self.phase_timings)
             return self.page
 
         except Exception as e:
             print(f"❌ Error navigating: {e}")
             return None
 
+    async def _evaluate(self, expression, on_error=None):
+        """
+        Evaluate JS in the page. Returns `on_error` if the tab is
+        mid-navigation or the script throws, so callers can tell "couldn't
+        look" apart from a real falsy answer.
+        """
+        try:
+            result = await self.page.evaluate(expression, return_by_value=True)
+        except Exception:
+            return on_error
+        # nodriver hands back ExceptionDetails when the script throws, and the
+        # raw RemoteObject when the value is falsy (0, false, '')
+        if isinstance(result, uc.cdp.runtime.ExceptionDetails):
+            return on_error
+        if isinstance(result, uc.cdp.runtime.RemoteObject):
+            return result.value
+        return result
+
+    async def _wait_until_ready(self, max_wait):
+        """
+        Poll the page instead of sleeping: wait out the Cloudflare challenge,
+        then return as soon as the member row count stops changing.
+        """
+        deadline = time.perf_counter() + max_wait
+
+        # Phase 1: Cloudflare challenge (usually zero when clearance is cached)
+        print("   Step 1: Checking for Cloudflare challenge...")
+        phase_start = time.perf_counter()
+        seen_challenge = False
+        while time.perf_counter() < deadline:
+            # A probe that fails (Cloudflare swapping documents) counts as still challenged
+            if not await self._evaluate(CLOUDFLARE_PROBE_JS, on_error=True):
+                break
+            if not seen_challenge:
+                print("   🛡️ Cloudflare challenge detected, waiting for it to clear...")
+                seen_challenge = True
+            await asyncio.sleep(self.poll_interval)
+        self.phase_timings['cloudflare'] = time.perf_counter() - phase_start
+
+        # Phase 2: First member row appears
+        print("   Step 2: Waiting for member rows to appear...")
+        phase_start = time.perf_counter()
+        row_count = 0
+        while time.perf_counter() < deadline:
+            row_count = await self._evaluate(ROW_COUNT_JS) or 0
+            if row_count > 0:
+                print(f"   ✅ Member rows appeared ({row_count})")
+                break
+            await asyncio.sleep(self.poll_interval)
+        else:
+            print(f"   ⚠️ No member rows after {max_wait}s")
+        self.phase_timings['table'] = time.perf_counter() - phase_start
+
+        # Phase 3: Row count holds steady for stable_window seconds
+        phase_start = time.perf_counter()
+        if row_count > 0:
+            print("   Step 3: Waiting for row count to stabilize...")
+            stable_since = time.perf_counter()
+            while time.perf_counter() < deadline:
+                await asyncio.sleep(self.poll_interval)
+                current = await self._evaluate(ROW_COUNT_JS)
+                if current is None:
+                    continue  # mid-navigation: no reading, not zero rows
+                if current != row_count:
+                    row_count = current
+                    stable_since = time.perf_counter()
+                elif time.perf_counter() - stable_since >= self.stable_window:
+                    print(f"   ✅ Row count stable at {row_count}")
+                    break
+        self.phase_timings['stabilize'] = time.perf_counter() - phase_start
+
+    async def _wait_fixed(self):
+        """Legacy fixed-sleep wait strategy"""
+        phase_start = time.perf_counter()
+
+        # Step 1: Wait for Cloudflare
+        print("   Step 1: Waiting for Cloudflare (3 seconds)...")
+        await asyncio.sleep(3)
+
+        # Step 2: Wait for table to appear with timeout
+        print("   Step 2: Waiting for member table to appear (up to 15 seconds)...")
+        try:
+            await self.page.wait_for_selector('table.club-member-table', timeout=7000)
+            print("   ✅ Table appeared!")
+        except Exception as e:
+            print(f"   ⚠️ Table selector timeout: {e}")
+            print("   Continuing anyway with extra wait...")
+            await asyncio.sleep(10)
+
+        # Step 3: Wait for table rows to populate
+        print("   Step 3: Waiting for rows to populate (up to 10 seconds)...")
+        try:
+            await self.page.wait_for_selector('table.club-member-table tbody tr', timeout=10000)
+            print("   ✅ Member rows appeared!")
+        except Exception as e:
+            print(f"   ⚠️ Rows timeout: {e}")
+            await asyncio.sleep(8)
+
+        # Step 4: Extra buffer for all content to render
+        print("   Step 4: Final render buffer (5 seconds)...")
+        await asyncio.sleep(5)
+        self.phase_timings['fixed_wait'] = time.perf_counter() - phase_start
+
+    async def capture_club_data(self, url):
+        """Navigate and take the member list from the network, skipping the DOM"""
+        if not self.page:
+            await self.create_session()
+
+        print(f"📡 Navigating to {url} (capturing network payload)...")
+        capture = NetworkCapture(self.page, self.payload_url_pattern)
+        try:
+            await capture.start()
+            started = time.perf_counter()
+            await self.page.get(url)
+            members = await capture.wait(self.payload_timeout)
+        except Exception as e:
+            print(f"   ⚠️ Network capture failed: {e}")
+            members = None
+        finally:
+            capture.stop()
+
+        if not members:
+            print("   ⚠️ No member payload seen on the network, falling back to DOM parsing")
+            return None
+
+        elapsed = time.perf_counter() - started
+        print(f"   ✅ Captured {len(members)} members from {capture.url} in {elapsed:.2f}s")
+        self.archive_in_background(capture.body, 'json')
+        self.phase_timings['network_capture'] = elapsed
+        self.session_data['last_visit'] = datetime.now().isoformat()
+        self.session_data['requests_made'] += 1
+        self.session_data['phase_timings'] = dict(self.phase_timings)
+        self.session_data['total_members'] = len(members)
+
+        return {
+            'html_size': capture.payload_size,
+            'members': members,
+            'timestamp': datetime.now().isoformat(),
+            'success': True,
+            'source': 'network'
+        }
+
     async def extract_club_data(self):
         """Extract club member data from the page"""
         if not self.page:
@@ -105,31 +302,33 @@ class ChrononesisClubScraper:
         print("🔍 Extracting club data...")
 
         try:
+            started = time.perf_counter()
             html_content = await self.page.get_content()
-            soup = BeautifulSoup(html_content, 'html.parser')
-
-            all_text = soup.get_text()
+            self.phase_timings['get_content'] = time.perf_counter() - started
+            self.archive_in_background(html_content, 'html')
             print(f"\n📊 Page stats:")
             print(f"   HTML size: {len(html_content)} characters")
-            print(f"   Text size: {len(all_text)} characters")
 
-            if 'Uchoom' in all_text:
-                print("   ✅ Found 'Uchoom' - data loaded!")
+            if 'club-member-row-container' in html_content:
+                print("   ✅ Found member rows - data loaded!")
             else:
-                print("   ⚠️ 'Uchoom' not found - might need more wait time")
+                print("   ⚠️ Member rows not found - might need more wait time")
                 # Save debug HTML
                 debug_path = self.output_dir / 'debug_page.html'
                 with open(debug_path, 'w', encoding='utf-8') as f:
                     f.write(html_content)
                 print(f"   Saved debug HTML to {debug_path}")
 
-            member_data = self.parse_member_table(soup)
+            started = time.perf_counter()
+            member_data = self.parse_html(html_content)
+            self.phase_timings['parse'] = time.perf_counter() - started
 
             return {
                 'html_size': len(html_content),
                 'members': member_data,
                 'timestamp': datetime.now().isoformat(),
-                'success': len(member_data) > 0
+                'success': len(member_data) > 0,
+                'source': 'dom'
             }
 
         except Exception as e:
@@ -138,6 +337,19 @@ class ChrononesisClubScraper:
             traceback.print_exc()
             return None
 
+    def parse_html(self, html_content):
+        """Parse raw page HTML with the configured backend"""
+        if self.parser == 'bs4':
+            return self.parse_member_table(BeautifulSoup(html_content, 'html.parser'))
+        if self.parser == 'strainer':
+            return self.parse_member_table(BeautifulSoup(
+                html_content, 'html.parser', parse_only=MEMBER_TABLE_STRAINER))
+
+        members = parse_members(html_content, self.parser)
+        print(f"   Parsed {len(members)} member rows ({self.parser})")
+        self.session_data['total_members'] = len(members)
+        return members
+
     def parse_member_table(self, soup):
         """Parse member data with correct field extraction"""
         members = []
@@ -251,25 +463,70 @@ class ChrononesisClubScraper:
         self.session_data['total_members'] = len(members)
         return members
 
-    async def save_results(self, data):
-        """Save results to JSON and CSV in output directory"""
+    def save_results(self, data, formats=('json', 'csv')):
+        """Save results to JSON and/or CSV in output directory (blocking)"""
         if not data or not data['members']:
             print("\n⚠️ No data to save")
             return
 
         # Save to JSON
-        json_path = self.output_dir / 'club_members.json'
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        print(f"💾 Saved to: {json_path}")
+        if 'json' in formats:
+            json_path = self.output_dir / 'club_members.json'
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            print(f"💾 Saved to: {json_path}")
 
         # Save to CSV
-        csv_path = self.output_dir / 'club_members.csv'
-        df = pd.DataFrame(data['members'])
-        df.to_csv(csv_path, index=False, encoding='utf-8')
-        print(f"💾 Saved to: {csv_path}")
-
-        # Print summary
+        if 'csv' in formats:
+            csv_path = self.output_dir / 'club_members.csv'
+            with open(csv_path, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=list(data['members'][0].keys()))
+                writer.writeheader()
+                writer.writerows(data['members'])
+            print(f"💾 Saved to: {csv_path}")
+
+    def save_session(self, session_data):
+        """Save session info (blocking)"""
+        session_path = self.output_dir / 'session_data.json'
+        with open(session_path, 'w', encoding='utf-8') as f:
+            json.dump(session_data, f, indent=2)
+        print(f"💾 Session data saved to {session_path}")
+
+    def export_in_background(self, data):
+        """Run the configured file sinks on a thread, off the scrape's hot path"""
+        formats = [f for f in self.exports if f in ('json', 'csv')]
+        jobs = []
+        if formats and data and data['success']:
+            jobs.append(asyncio.to_thread(self.save_results, data, formats))
+        if 'session' in self.exports:
+            jobs.append(asyncio.to_thread(self.save_session, dict(self.session_data)))
+
+        for job in jobs:
+            self._in_background(job)
+
+    def archive_in_background(self, content, kind):
+        """Store a fetched page in the archive on a thread"""
+        if self.archive and content:
+            self._in_background(asyncio.to_thread(
+                self.archive.store, self.club, content, kind, datetime.now()))
+
+    def _in_background(self, job):
+        task = asyncio.ensure_future(job)
+        self._export_tasks.add(task)
+        task.add_done_callback(self._export_done)
+
+    def _export_done(self, task):
+        self._export_tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            print(f"⚠️ Export failed: {task.exception()}")
+
+    async def flush_exports(self):
+        """Wait for any background exports (and archive writes) still running"""
+        if self._export_tasks:
+            await asyncio.gather(*self._export_tasks, return_exceptions=True)
+
+    def print_summary(self, data):
+        """Print a short summary of the extracted members"""
         print(f"\n📊 Summary:")
         print(f"   Total members: {len(data['members'])}")
         print(
@@ -303,34 +560,81 @@ class ChrononesisClubScraper:
             print("🛑 Browser closed")
 
     async def scrape_club(self, circle_id='Uchoom'):
-        """Main scraping method"""
+        """Main scraping method, returns the extracted data dict (or None)"""
+        request_filter = None
+        monitor = None
+        # Seconds per stage of this scrape (browser_start, navigation, the
+        # wait phases, get_content, parse); read by the caller afterwards
+        self.phase_timings = {}
+        self.club = circle_id
         try:
-            await self.initialize_browser()
-            await self.create_session()
-
-            url = f"https://chronogenesis.net/club_profile?circle_id={circle_id}"
-            await self.navigate_to_page(url, max_wait=30)
-
-            data = await self.extract_club_data()
+            started = time.perf_counter()
+            if self.browser_manager:
+                self.page = await self.browser_manager.acquire()
+                browser = self.browser_manager.browser
+            else:
+                await self.initialize_browser()
+                await self.create_session()
+                browser = self.browser
+            self.phase_timings['browser_start'] = time.perf_counter() - started
+
+            monitor = ProcessTreeMonitor(browser_pid(browser))
+            await monitor.start()
+
+            request_filter = RequestFilter.from_profile(self.block_profile)
+            if request_filter:
+                await request_filter.attach(self.page)
+
+            url = f"{self.base_url}/club_profile?circle_id={circle_id}"
+            data = None
+            if self.extraction == 'network':
+                data = await self.capture_club_data(url)
+
+            if not data:
+                await self.navigate_to_page(url, max_wait=30)
+                data = await self.extract_club_data()
+
+            if request_filter:
+                await request_filter.detach()
+                stats = request_filter.stats()
+                self.session_data['request_filter'] = stats
+                print(f"🚫 Blocked {stats['blocked_requests']} requests "
+                      f"(~{stats['est_bytes_saved'] / 1024:.0f} KiB saved, "
+                      f"{stats['bytes_received'] / 1024:.0f} KiB received)")
+
+            resources = await monitor.stop()
+            monitor = None
+            if resources:
+                self.session_data['resources'] = resources
+                print(f"🧠 Browser tree: peak RSS {resources['peak_rss_mb']} MiB, "
+                      f"CPU {resources['cpu_seconds']}s across {resources['processes']} processes")
 
             if data and data['success']:
                 print(f"\n✅ SUCCESS! Extracted {len(data['members'])} members")
-                await self.save_results(data)
+                self.print_summary(data)
             else:
                 print("\n⚠️ No data extracted")
                 print("   The page may still be loading.")
                 print("   Try increasing wait times or check browser window")
 
-            # Save session info
-            session_path = self.output_dir / 'session_data.json'
-            with open(session_path, 'w', encoding='utf-8') as f:
-                json.dump(self.session_data, f, indent=2)
-            print(f"💾 Session data saved to {session_path}")
+            # JSON/CSV/session files are optional and written off the hot path
+            self.export_in_background(data)
+            return data
 
         except Exception as e:
             print(f"❌ Error: {e}")
             import traceback
             traceback.print_exc()
+            return None
 
         finally:
-            await self.close()
+            if monitor:
+                await monitor.stop()
+            if request_filter:
+                await request_filter.detach()
+            if self.browser_manager:
+                if self.page:
+                    await self.browser_manager.release(self.page)
+                    self.page = None
+            else:
+                await self.close()
@@ -19,8 +19,53 @@ except (TypeError, ValueError):
 # Bot Settings
 NOTIFICATION_TIME = os.getenv('NOTIFICATION_TIME', '08:00')
 CLUB_NAME = os.getenv('SCRAPE_CLUB_NAME', 'Uchoom')
+# Comma separated list of clubs to track; defaults to the single club above
+CLUB_NAMES = [c.strip() for c in os.getenv('SCRAPE_CLUB_NAMES', CLUB_NAME).split(',') if c.strip()]
+# How many clubs may be scraped at once (one browser tab each)
+SCRAPE_CONCURRENCY = int(os.getenv('SCRAPE_CONCURRENCY', '3'))
+# Minutes between each club's daily job so they don't all fire together
+SCRAPE_STAGGER_MINUTES = int(os.getenv('SCRAPE_STAGGER_MINUTES', '5'))
+# 'dom' parses the rendered table, 'network' reads the member JSON via CDP
+SCRAPE_EXTRACTION = os.getenv('SCRAPE_EXTRACTION', 'dom')
+# HTML parser backend: lxml, selectolax, strainer or bs4 (see chronogenesis_scraper/parsers.py)
+SCRAPE_PARSER = os.getenv('SCRAPE_PARSER', 'lxml')
+# Requests to block while scraping: off, default (images/fonts/media/ads) or strict
+SCRAPE_BLOCK_PROFILE = os.getenv('SCRAPE_BLOCK_PROFILE', 'default')
+# Browser launch profile: desktop (GUI Chrome), headless, or lowmem (headless + memory limits)
+BROWSER_PROFILE = os.getenv('BROWSER_PROFILE', 'desktop')
+# 'process' runs the browser in a worker process (keeps the bot responsive), 'inline' doesn't
+SCRAPE_ISOLATION = os.getenv('SCRAPE_ISOLATION', 'process')
+# Seconds before a stuck scrape is abandoned and the worker restarted
+SCRAPE_TIMEOUT = int(os.getenv('SCRAPE_TIMEOUT', '300'))
+# Optional file exports written in the background: any of json, csv, session (empty = none)
+SCRAPE_EXPORTS = [e.strip() for e in os.getenv('SCRAPE_EXPORTS', 'json,csv,session').split(',') if e.strip()]
+# Site to scrape; point it at a mirror or benchmarks/bench_pipeline.py's local server
+SCRAPE_BASE_URL = os.getenv('SCRAPE_BASE_URL', 'https://chronogenesis.net')
+# Fans each member must gain per week (Mon-Sun)
+WEEKLY_QUOTA = int(os.getenv('WEEKLY_QUOTA', '3000000'))
+# Read-only SQLite connections serving slash commands while snapshots are written (min 1)
+DB_READERS = int(os.getenv('DB_READERS', '2'))
+# Seconds before a database query is interrupted
+DB_QUERY_TIMEOUT = float(os.getenv('DB_QUERY_TIMEOUT', '10'))
+# Snapshot retention: every scrape for N days, then one per member per day,
+# and after SNAPSHOT_DAILY_DAYS one per member per week
+SNAPSHOT_RAW_DAYS = int(os.getenv('SNAPSHOT_RAW_DAYS', '30'))
+SNAPSHOT_DAILY_DAYS = int(os.getenv('SNAPSHOT_DAILY_DAYS', '365'))
+# Daily retention + ANALYZE (and VACUUM when worthwhile)
+MAINTENANCE_TIME = os.getenv('MAINTENANCE_TIME', '04:00')
+# Prometheus metrics: served on 127.0.0.1:METRICS_PORT (0 = off) and/or
+# rewritten every minute to METRICS_FILE (empty = off)
+METRICS_PORT = int(os.getenv('METRICS_PORT', '0'))
+METRICS_FILE = os.getenv('METRICS_FILE', '')
+# Rendered leaderboards kept in memory between snapshots
+REPORT_CACHE_SIZE = int(os.getenv('REPORT_CACHE_SIZE', '128'))
 TIMEZONE = 'Asia/Ho_Chi_Minh'
 
 # Paths
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-OUTPUT_DIR = os.path.join(BASE_DIR, 'output')
+OUTPUT_DIR = os.getenv('OUTPUT_DIR', os.path.join(BASE_DIR, 'output'))
+# Compressed archive of every fetched page, next to OUTPUT_DIR (empty = off);
+# reparse_archive.py rebuilds snapshots from it
+PAGE_ARCHIVE_DIR = os.getenv('PAGE_ARCHIVE_DIR', os.path.join(os.path.dirname(os.path.abspath(OUTPUT_DIR)), 'page_archive'))
+# SQLite database file; relative paths live next to database.py
+DB_PATH = os.getenv('DB_PATH', 'club_data.db')
@@ -1,160 +1,881 @@
 import sqlite3
+import json
+import asyncio
 import logging
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
+from metrics import DB_QUERY_SECONDS, DB_TIMEOUTS
+
 logger = logging.getLogger('discord_bot.database')
 
+# Rollup grains; each bucket is keyed by the date it starts on
+ROLLUP_PERIODS = ('daily', 'weekly', 'monthly')
+
+# Schema generation stored in PRAGMA user_version
+# 2: integer member keys and epoch-second snapshot timestamps
+SCHEMA_VERSION = 2
+
+# Snapshot timestamps are Unix epoch seconds; buckets follow the local calendar
+# like period_start() does ('weekday 0' is the coming Sunday, so -6 days is
+# the ISO week's Monday)
+LOCAL_DAY_SQL = "date(timestamp, 'unixepoch', 'localtime')"
+ROLLUP_BUCKET_SQL = {
+    'daily': LOCAL_DAY_SQL,
+    'weekly': "date(timestamp, 'unixepoch', 'localtime', 'weekday 0', '-6 days')",
+    'monthly': "date(timestamp, 'unixepoch', 'localtime', 'start of month')",
+}
+
+# Keeps a member's first and latest fans of the bucket; gain follows from them
+ROLLUP_UPSERT = '''
+INSERT INTO rollups (period, period_start, member_id, start_fans, end_fans, gain)
+VALUES (?, ?, ?, ?, ?, 0)
+ON CONFLICT (period, period_start, member_id) DO UPDATE SET
+    end_fans = excluded.end_fans,
+    gain = excluded.end_fans - rollups.start_fans
+'''
+
+# One primary-key range read of the period's bucket: O(members), whatever the history
+LEADERBOARD_QUERY = '''
+SELECT
+    m.current_name,
+    r.gain as period_gain
+FROM rollups r
+JOIN members m ON m.id = r.member_id
+WHERE r.period = ? AND r.period_start = ?
+  AND m.is_active = 1 AND (? IS NULL OR m.club = ?)
+ORDER BY period_gain DESC
+'''
+
+# Today's gain runs from the member's last checkpoint before today (carried
+# forward over days without a scrape) to the latest one: with one scrape a
+# day, today's own bucket would only ever show +0. One extra
+# idx_rollups_member seek per member.
+DAILY_LEADERBOARD_QUERY = '''
+SELECT
+    m.current_name,
+    r.end_fans - COALESCE(
+        (SELECT p.end_fans FROM rollups p
+         WHERE p.period = 'daily' AND p.member_id = r.member_id AND p.period_start < r.period_start
+         ORDER BY p.period_start DESC LIMIT 1),
+        r.start_fans) as period_gain
+FROM rollups r
+JOIN members m ON m.id = r.member_id
+WHERE r.period = ? AND r.period_start = ?
+  AND m.is_active = 1 AND (? IS NULL OR m.club = ?)
+ORDER BY period_gain DESC
+'''
+
+# Fans a member had at the end of a date range boundary, from the daily
+# rollups used as sorted per-member checkpoints. Days without a scrape carry
+# the previous checkpoint forward. Each lookup is one idx_rollups_member seek.
+RANGE_GAIN_SELECT = '''
+SELECT
+    m.friend_id,
+    m.current_name,
+    (SELECT end_fans FROM rollups
+     WHERE period = 'daily' AND member_id = m.id AND period_start <= :end
+     ORDER BY period_start DESC LIMIT 1) as end_fans,
+    COALESCE(
+        (SELECT end_fans FROM rollups
+         WHERE period = 'daily' AND member_id = m.id AND period_start < :start
+         ORDER BY period_start DESC LIMIT 1),
+        (SELECT start_fans FROM rollups
+         WHERE period = 'daily' AND member_id = m.id
+           AND period_start >= :start AND period_start <= :end
+         ORDER BY period_start LIMIT 1)
+    ) as start_fans
+FROM members m
+'''
+
+# MATERIALIZED keeps SQLite from re-running the boundary seeks per output column
+RANGE_LEADERBOARD_QUERY = f'''
+WITH boundaries AS MATERIALIZED ({RANGE_GAIN_SELECT}
+    WHERE m.is_active = 1 AND (:club IS NULL OR m.club = :club))
+SELECT current_name, end_fans - start_fans as period_gain
+FROM boundaries
+WHERE start_fans IS NOT NULL AND end_fans IS NOT NULL
+ORDER BY period_gain DESC
+LIMIT :limit
+'''
+
+# First/last snapshot for any number of members in one statement. Each member
+# costs two seeks at either end of their slice of the snapshots primary key
+# (member_id, timestamp), so the cost never depends on how long the history is.
+# {where} picks the members: one friend_id or a whole club.
+LIFETIME_STATS_QUERY = '''
+WITH ends AS MATERIALIZED (
+    SELECT
+        m.id as member_id,
+        (SELECT MIN(timestamp) FROM snapshots WHERE member_id = m.id) as first_ts,
+        (SELECT MAX(timestamp) FROM snapshots WHERE member_id = m.id) as last_ts
+    FROM members m
+    WHERE {where}
+)
+SELECT
+    m.current_name as name,
+    m.friend_id as id,
+    m.joined_at as joined,
+    m.club,
+    m.is_active,
+    strftime('%Y-%m-%dT%H:%M:%S', f.timestamp, 'unixepoch', 'localtime') as first_seen,
+    strftime('%Y-%m-%dT%H:%M:%S', l.timestamp, 'unixepoch', 'localtime') as last_seen,
+    f.total_fans as original_fans,
+    l.total_fans as current_fans,
+    l.total_fans - f.total_fans as accumulated_fans
+FROM ends e
+JOIN members m ON m.id = e.member_id
+JOIN snapshots f ON f.member_id = e.member_id AND f.timestamp = e.first_ts
+JOIN snapshots l ON l.member_id = e.member_id AND l.timestamp = e.last_ts
+ORDER BY accumulated_fans DESC
+'''
+
+# Per active member: the last snapshot before the week, the first one inside
+# it and the latest one (epoch seconds). Three primary-key seeks per member,
+# any number of clubs.
+QUOTA_INPUTS_QUERY = '''
+WITH ends AS MATERIALIZED (
+    SELECT
+        m.id as member_id,
+        (SELECT MAX(timestamp) FROM snapshots WHERE member_id = m.id AND timestamp < :start) as prev_ts,
+        (SELECT MIN(timestamp) FROM snapshots WHERE member_id = m.id AND timestamp >= :start) as first_ts,
+        (SELECT MAX(timestamp) FROM snapshots WHERE member_id = m.id) as last_ts
+    FROM members m
+    WHERE m.is_active = 1 AND (:club IS NULL OR m.club = :club)
+)
+SELECT
+    m.friend_id,
+    m.current_name as name,
+    m.club,
+    p.timestamp as prev_time,
+    p.total_fans as prev_fans,
+    f.timestamp as first_time,
+    f.total_fans as first_fans,
+    l.timestamp as last_time,
+    l.total_fans as last_fans
+FROM ends e
+JOIN members m ON m.id = e.member_id
+JOIN snapshots f ON f.member_id = e.member_id AND f.timestamp = e.first_ts
+JOIN snapshots l ON l.member_id = e.member_id AND l.timestamp = e.last_ts
+LEFT JOIN snapshots p ON p.member_id = e.member_id AND p.timestamp = e.prev_ts
+'''
+
+# The club as of its latest scrape, shaped like the scraper's normalized
+# members: one primary-key seek per active member
+LATEST_SNAPSHOT_QUERY = '''
+SELECT
+    m.friend_id as id,
+    m.current_name as name,
+    s.total_fans as fans,
+    s.daily_gain_ingame as gain,
+    s.timestamp
+FROM members m
+JOIN snapshots s ON s.member_id = m.id
+ AND s.timestamp = (SELECT MAX(timestamp) FROM snapshots WHERE member_id = m.id)
+WHERE m.is_active = 1 AND (:club IS NULL OR m.club = :club)
+'''
+
+# Downsampling: of the snapshots older than :cutoff, keep only the last one per
+# member per {bucket}, plus every member's first-ever snapshot (lifetime stats)
+DOWNSAMPLE_QUERY = '''
+DELETE FROM snapshots
+WHERE (member_id, timestamp) IN (
+    SELECT member_id, timestamp FROM (
+        SELECT member_id, timestamp,
+               ROW_NUMBER() OVER (PARTITION BY member_id, {bucket} ORDER BY timestamp DESC) AS rn,
+               MIN(timestamp) OVER (PARTITION BY member_id) AS first_seen
+        FROM snapshots
+        WHERE timestamp < :cutoff
+    )
+    WHERE rn > 1 AND timestamp > first_seen
+)
+'''
+
+
+def period_start(period, when=None):
+    """ISO date of the daily/weekly/monthly bucket that contains `when`"""
+    day = (when or datetime.now()).date()
+    if period == 'weekly':
+        day -= timedelta(days=day.weekday())
+    elif period == 'monthly':
+        day = day.replace(day=1)
+    elif period != 'daily':
+        raise ValueError(f"Unknown rollup period: {period}")
+    return day.isoformat()
+
+
 class DatabaseManager:
-    def __init__(self, db_name="club_data.db"):
+    def __init__(self, db_name="club_data.db", readonly=False):
         self.db_path = Path(__file__).parent / db_name
-        self.conn = sqlite3.connect(self.db_path)
+        # Bumped on every committed write; caches compare against it
+        self.snapshot_version = 0
+        # Snapshots removed by retention; maintain() reclaims their space
+        self.deleted_since_vacuum = 0
+        # Connections may be handed to a worker thread (see AsyncDatabase)
+        if readonly:
+            self.conn = sqlite3.connect(
+                f"{self.db_path.resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False)
+            self.conn.row_factory = sqlite3.Row
+            # The writer built (or failed to build) the name index already
+            self.has_fts = self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'member_names_fts'").fetchone() is not None
+            return
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
         # Allow accessing columns by name (row['fans'])
         self.conn.row_factory = sqlite3.Row
+        # WAL lets readers run alongside the nightly write; NORMAL is durable
+        # across application crashes and only fsyncs at checkpoints
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
         self._init_tables()
 
     def _init_tables(self):
         """Create the tables if they don't exist"""
         c = self.conn.cursor()
+        version = c.execute("PRAGMA user_version").fetchone()[0]
+        has_members = c.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'members'").fetchone()
+        legacy = has_members is not None and version < SCHEMA_VERSION
+        if legacy:
+            # The whole migration commits together with the schema below
+            c.execute("BEGIN")
+            self._set_aside_legacy_tables(c)
         
         # 1. Members Table: Keeps track of who is who (ID is constant, Name changes)
+        # `id` is a compact surrogate key; friend_id stays the public identity
         c.execute('''
             CREATE TABLE IF NOT EXISTS members (
-                friend_id TEXT PRIMARY KEY,
+                id INTEGER PRIMARY KEY,
+                friend_id TEXT UNIQUE NOT NULL,
                 current_name TEXT,
                 joined_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                is_active BOOLEAN DEFAULT 1
+                is_active BOOLEAN DEFAULT 1,
+                club TEXT
             )
         ''')
         
         # 2. Snapshots Table: The history of every scrape
+        # Clustered by member then time (epoch seconds), so one member's
+        # history is contiguous and needs no separate index
         c.execute('''
             CREATE TABLE IF NOT EXISTS snapshots (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                friend_id TEXT,
-                timestamp DATETIME,
+                member_id INTEGER NOT NULL REFERENCES members(id),
+                timestamp INTEGER NOT NULL,
                 total_fans INTEGER,
                 daily_gain_ingame INTEGER,
-                FOREIGN KEY(friend_id) REFERENCES members(friend_id)
+                PRIMARY KEY (member_id, timestamp)
+            ) WITHOUT ROWID
+        ''')
+
+        # 3. Rollups: first/last fans per member per day, ISO week and month
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS rollups (
+                period TEXT,
+                period_start TEXT,
+                member_id INTEGER,
+                start_fans INTEGER,
+                end_fans INTEGER,
+                gain INTEGER,
+                PRIMARY KEY (period, period_start, member_id)
+            ) WITHOUT ROWID
+        ''')
+        c.execute('''
+            CREATE INDEX IF NOT EXISTS idx_rollups_member
+            ON rollups (member_id, period, period_start, start_fans, end_fans)
+        ''')
+
+        # 4. Name history: every name a member has been seen under
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS member_names (
+                id INTEGER PRIMARY KEY,
+                member_id INTEGER REFERENCES members(id),
+                name TEXT,
+                first_seen INTEGER,
+                UNIQUE (member_id, name)
+            )
+        ''')
+        c.execute('''
+            CREATE INDEX IF NOT EXISTS idx_member_names_name
+            ON member_names (name COLLATE NOCASE)
+        ''')
+        self.has_fts = self._init_name_index(c)
+
+        # 5. Scrape state: content hash of the last written snapshot per club,
+        # when it was written and when the same state was last seen again
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS scrape_state (
+                club TEXT PRIMARY KEY,
+                content_hash TEXT,
+                changed_at INTEGER,
+                seen_at INTEGER,
+                skipped INTEGER DEFAULT 0
             )
         ''')
+
+        if legacy:
+            self._migrate_legacy_tables(c)
+
+        # Seed the history with current names (renames before this are unknown)
+        c.execute('''
+            INSERT OR IGNORE INTO member_names (member_id, name, first_seen)
+            SELECT id, current_name, CAST(strftime('%s', joined_at) AS INTEGER) FROM members
+            WHERE current_name IS NOT NULL
+        ''')
+        c.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
         
         self.conn.commit()
 
-    def save_snapshot(self, scraper_data):
+        # Databases from before the rollups existed get them built once
+        if (c.execute("SELECT 1 FROM rollups LIMIT 1").fetchone() is None
+                and c.execute("SELECT 1 FROM snapshots LIMIT 1").fetchone() is not None):
+            self.rebuild_rollups()
+
+        if legacy:
+            # Give the space of the old text-keyed tables back to the filesystem
+            self.conn.execute("VACUUM")
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            logger.info("🗜️ Migrated the database to compact storage.")
+
+    def _set_aside_legacy_tables(self, c):
+        """Rename pre-compact tables out of the way; derived data is rebuilt"""
+        tables = {row[0] for row in c.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        for trigger in ('member_names_ai', 'member_names_ad', 'member_names_au'):
+            c.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        c.execute("DROP TABLE IF EXISTS member_names_fts")
+        c.execute("DROP TABLE IF EXISTS rollups")
+        for name in ('members', 'snapshots', 'member_names'):
+            if name in tables:
+                c.execute(f"ALTER TABLE {name} RENAME TO legacy_{name}")
+        for index in ('idx_snapshots_member_time', 'idx_snapshots_time',
+                      'idx_rollups_member', 'idx_member_names_name'):
+            c.execute(f"DROP INDEX IF EXISTS {index}")
+
+    def _migrate_legacy_tables(self, c):
+        """Copy text-keyed, ISO-timestamped rows into the compact tables"""
+        columns = [row['name'] for row in c.execute("PRAGMA table_info(legacy_members)")]
+        club = "club" if 'club' in columns else "NULL"
+        c.execute(f'''
+            INSERT INTO members (friend_id, current_name, joined_at, is_active, club)
+            SELECT friend_id, current_name, joined_at, is_active, {club}
+            FROM legacy_members ORDER BY joined_at, rowid
+        ''')
+        # Snapshots of members missing from the members table still get a key
+        c.execute('''
+            INSERT OR IGNORE INTO members (friend_id, is_active)
+            SELECT DISTINCT friend_id, 0 FROM legacy_snapshots WHERE friend_id IS NOT NULL
+        ''')
+        # ISO strings were local wall-clock time; 'utc' converts them to epoch
+        c.execute('''
+            INSERT OR IGNORE INTO snapshots (member_id, timestamp, total_fans, daily_gain_ingame)
+            SELECT m.id, CAST(strftime('%s', s.timestamp, 'utc') AS INTEGER),
+                   s.total_fans, s.daily_gain_ingame
+            FROM legacy_snapshots s
+            JOIN members m ON m.friend_id = s.friend_id
+            WHERE s.timestamp IS NOT NULL
+        ''')
+
+        tables = {row[0] for row in c.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if 'legacy_member_names' in tables:
+            c.execute('''
+                INSERT OR IGNORE INTO member_names (member_id, name, first_seen)
+                SELECT m.id, n.name, CAST(strftime('%s', n.first_seen, 'utc') AS INTEGER)
+                FROM legacy_member_names n
+                JOIN members m ON m.friend_id = n.friend_id
+                ORDER BY n.id
+            ''')
+            c.execute("DROP TABLE legacy_member_names")
+
+        moved = c.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+        c.execute("DROP TABLE legacy_snapshots")
+        c.execute("DROP TABLE legacy_members")
+        logger.info(f"📦 Migrated {moved} snapshots to integer keys and epoch timestamps.")
+
+    def _init_name_index(self, c):
+        """FTS5 trigram index over member_names, kept in sync by triggers"""
+        try:
+            c.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS member_names_fts USING fts5(
+                    name, content='member_names', content_rowid='id', tokenize='trigram'
+                )
+            ''')
+        except sqlite3.OperationalError as e:
+            logger.warning(f"⚠️ FTS5 trigram search unavailable, using LIKE: {e}")
+            return False
+
+        # Plain execute (not executescript) so a running migration stays one transaction
+        c.execute('''
+            CREATE TRIGGER IF NOT EXISTS member_names_ai AFTER INSERT ON member_names BEGIN
+                INSERT INTO member_names_fts (rowid, name) VALUES (new.id, new.name);
+            END
+        ''')
+        c.execute('''
+            CREATE TRIGGER IF NOT EXISTS member_names_ad AFTER DELETE ON member_names BEGIN
+                INSERT INTO member_names_fts (member_names_fts, rowid, name)
+                VALUES ('delete', old.id, old.name);
+            END
+        ''')
+        c.execute('''
+            CREATE TRIGGER IF NOT EXISTS member_names_au AFTER UPDATE OF name ON member_names BEGIN
+                INSERT INTO member_names_fts (member_names_fts, rowid, name)
+                VALUES ('delete', old.id, old.name);
+                INSERT INTO member_names_fts (rowid, name) VALUES (new.id, new.name);
+            END
+        ''')
+        return True
+
+    def rebuild_rollups(self):
+        """Recompute every rollup bucket from the raw snapshots"""
+        c = self.conn.cursor()
+        c.execute("DELETE FROM rollups")
+        for period, bucket in ROLLUP_BUCKET_SQL.items():
+            c.execute(f'''
+                INSERT INTO rollups (period, period_start, member_id, start_fans, end_fans, gain)
+                SELECT ?, bucket, member_id, start_fans, end_fans, end_fans - start_fans
+                FROM (
+                    SELECT
+                        member_id,
+                        bucket,
+                        FIRST_VALUE(total_fans) OVER w as start_fans,
+                        LAST_VALUE(total_fans) OVER w as end_fans,
+                        ROW_NUMBER() OVER w as rn
+                    FROM (SELECT member_id, timestamp, total_fans, {bucket} as bucket FROM snapshots)
+                    WINDOW w AS (
+                        PARTITION BY member_id, bucket ORDER BY timestamp
+                        ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING
+                    )
+                )
+                WHERE rn = 1
+            ''', (period,))
+        self.conn.commit()
+        self.snapshot_version += 1
+        count = c.execute("SELECT COUNT(*) FROM rollups").fetchone()[0]
+        logger.info(f"📊 Rebuilt {count} rollup rows from snapshots.")
+
+    def save_snapshot(self, scraper_data, club=None, content_hash=None, when=None):
         """
         Takes the list from the scraper and saves it to DB.
-        Auto-detects new members and name changes.
+        Auto-detects new members, name changes and departures, and only
+        writes member rows that actually changed. Rollups are updated in the
+        same transaction as the raw snapshots. `content_hash` (see
+        record_heartbeat) is stored as the club's latest state. `when`
+        backdates the scrape (imports, synthetic histories); snapshots must
+        then still arrive in chronological order.
         """
         c = self.conn.cursor()
-        timestamp = datetime.now().isoformat()
+        now = when or datetime.now()
+        timestamp = int(now.timestamp())
+        joined_at = datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        buckets = [(period, period_start(period, now)) for period in ROLLUP_PERIODS]
         
         try:
-            # 1. Mark everyone as inactive first (we will re-activate those we see)
-            c.execute("UPDATE members SET is_active = 0")
-            
+            # scraper_data may be any iterable of normalized members
+            seen = {}
+            scraped = []
             for m in scraper_data:
-                f_id = m['id']
-                name = m['name']
-                fans = m['fans']
-                gain = m['gain']
-                
-                # 2. Update/Insert Member
-                c.execute('''
-                    INSERT INTO members (friend_id, current_name, is_active)
-                    VALUES (?, ?, 1)
-                    ON CONFLICT(friend_id) DO UPDATE SET 
-                        current_name = excluded.current_name,
-                        is_active = 1
-                ''', (f_id, name))
-                
-                # 3. Insert Snapshot
+                seen[m['id']] = m['name']
+                scraped.append((m['id'], m['fans'], m['gain']))
+
+            new, changed, departed = self._diff_members(c, seen, club)
+
+            # 1. Member table: only the rows that differ from the last scrape
+            c.executemany(
+                "INSERT INTO members (friend_id, current_name, is_active, club, joined_at) VALUES (?, ?, 1, ?, ?)",
+                [(f_id, seen[f_id], club, joined_at) for f_id in new])
+            c.executemany(
+                "UPDATE members SET current_name = ?, is_active = 1, club = COALESCE(?, club) WHERE friend_id = ?",
+                [(seen[f_id], club, f_id) for f_id in changed])
+            c.executemany(
+                "UPDATE members SET is_active = 0 WHERE friend_id = ?",
+                [(f_id,) for f_id in departed])
+
+            keys = dict(c.execute(
+                "SELECT friend_id, id FROM members WHERE friend_id IN (SELECT value FROM json_each(?))",
+                (json.dumps(list(seen)),)).fetchall())
+            c.executemany(
+                "INSERT OR IGNORE INTO member_names (member_id, name, first_seen) VALUES (?, ?, ?)",
+                [(keys[f_id], seen[f_id], timestamp) for f_id in new + changed])
+
+            # 2. Snapshots: one bulk insert
+            snapshot_rows = [(keys[f_id], timestamp, fans, gain) for f_id, fans, gain in scraped]
+            c.executemany('''
+                INSERT OR REPLACE INTO snapshots (member_id, timestamp, total_fans, daily_gain_ingame)
+                VALUES (?, ?, ?, ?)
+            ''', snapshot_rows)
+
+            # 3. Rollups: advance today's, this week's and this month's buckets
+            c.executemany(ROLLUP_UPSERT, [
+                (period, start, member_id, fans, fans)
+                for period, start in buckets
+                for member_id, _, fans, _ in snapshot_rows])
+
+            # 4. Remember what was written so identical scrapes can be skipped
+            if club is not None:
                 c.execute('''
-                    INSERT INTO snapshots (friend_id, timestamp, total_fans, daily_gain_ingame)
+                    INSERT INTO scrape_state (club, content_hash, changed_at, seen_at)
                     VALUES (?, ?, ?, ?)
-                ''', (f_id, timestamp, fans, gain))
-                
+                    ON CONFLICT (club) DO UPDATE SET
+                        content_hash = excluded.content_hash,
+                        changed_at = excluded.changed_at,
+                        seen_at = excluded.seen_at
+                ''', (club, content_hash, timestamp, timestamp))
+
             self.conn.commit()
-            logger.info(f"💾 Database updated with {len(scraper_data)} records.")
+            self.snapshot_version += 1
+            logger.info(
+                f"💾 Database updated with {len(snapshot_rows)} records "
+                f"({len(new)} new, {len(changed)} changed, {len(departed)} departed).")
+            return {'records': len(snapshot_rows), 'new': len(new),
+                    'changed': len(changed), 'departed': len(departed)}
             
         except Exception as e:
             logger.error(f"❌ Database error: {e}")
             self.conn.rollback()
+            return None
 
-    def get_leaderboard(self, start_date_iso):
-        """Calculates GAIN from a specific start date until NOW."""
-        c = self.conn.cursor()
-        query = '''
-        WITH 
-        CurrentState AS (
-            SELECT friend_id, total_fans as end_fans
-            FROM snapshots 
-            WHERE id IN (SELECT MAX(id) FROM snapshots GROUP BY friend_id)
-        ),
-        BaselineState AS (
-            SELECT s.friend_id, s.total_fans as start_fans
-            FROM snapshots s
-            JOIN (
-                SELECT friend_id, MIN(timestamp) as min_time
-                FROM snapshots 
-                WHERE timestamp >= ? 
-                GROUP BY friend_id
-            ) first_s ON s.friend_id = first_s.friend_id AND s.timestamp = first_s.min_time
-        )
-        
-        SELECT 
-            m.current_name,
-            (curr.end_fans - base.start_fans) as period_gain
-        FROM members m
-        JOIN CurrentState curr ON m.friend_id = curr.friend_id
-        JOIN BaselineState base ON m.friend_id = base.friend_id
-        WHERE m.is_active = 1
-        ORDER BY period_gain DESC
-        '''
-        c.execute(query, (start_date_iso,))
+    def record_heartbeat(self, club, content_hash, when=None):
+        """
+        If the club's last snapshot was written today with the same content
+        hash, only note that it was seen again and return True; the caller
+        then skips save_snapshot. The first scrape of each day is always
+        written so every daily rollup bucket (and leaderboard) has its rows.
+        `when` backdates the sighting, as in save_snapshot.
+        """
+        now = when or datetime.now()
+        midnight = int(now.replace(hour=0, minute=0, second=0, microsecond=0).timestamp())
+        c = self.conn.cursor()
+        c.execute('''
+            UPDATE scrape_state SET seen_at = ?, skipped = skipped + 1
+            WHERE club = ? AND content_hash = ? AND changed_at >= ?
+        ''', (int(now.timestamp()), club, content_hash, midnight))
+        self.conn.commit()
+        return c.rowcount > 0
+
+    def get_latest_snapshot(self, club=None):
+        """
+        The last stored scrape of a club: {'taken_at': epoch seconds,
+        'members': [{id, name, fans, gain}]}, or None if there is none yet.
+        A scrape skipped as unchanged counts as a fresh sighting.
+        """
+        c = self.conn.cursor()
+        rows = c.execute(LATEST_SNAPSHOT_QUERY, {'club': club}).fetchall()
+        if not rows:
+            return None
+        taken_at = max(row['timestamp'] for row in rows)
+        if club is not None:
+            seen = c.execute("SELECT seen_at FROM scrape_state WHERE club = ?", (club,)).fetchone()
+            if seen and seen[0]:
+                taken_at = max(taken_at, seen[0])
+        members = [{'id': row['id'], 'name': row['name'], 'fans': row['fans'], 'gain': row['gain']}
+                   for row in rows]
+        return {'taken_at': taken_at, 'members': members}
+
+    def get_scrape_state(self, club):
+        """Last write, last sighting and skipped-write count for a club"""
+        c = self.conn.cursor()
+        row = c.execute('''
+            SELECT club, content_hash, changed_at, seen_at, skipped
+            FROM scrape_state WHERE club = ?
+        ''', (club,)).fetchone()
+        return dict(row) if row else None
+
+    def _diff_members(self, c, seen, club):
+        """
+        Compare scraped {friend_id: name} with the stored member rows.
+        Returns (new ids, ids needing an update, ids that left the club).
+        """
+        # The club's roster (rows from before multi-club tracking have no club
+        # and are claimed on sight) plus anyone scraped now, wherever they were
+        if club:
+            scope = "club = ? OR club IS NULL"
+            params = (club,)
+        else:
+            scope = "1"
+            params = ()
+        c.execute(f'''
+            SELECT friend_id, current_name, is_active, club FROM members
+            WHERE {scope} OR friend_id IN (SELECT value FROM json_each(?))
+        ''', params + (json.dumps(list(seen)),))
+        known = {row['friend_id']: row for row in c.fetchall()}
+
+        new = [f_id for f_id in seen if f_id not in known]
+        changed = [
+            f_id for f_id in seen if f_id in known and (
+                known[f_id]['current_name'] != seen[f_id]
+                or not known[f_id]['is_active']
+                or (club and known[f_id]['club'] != club))
+        ]
+        departed = [
+            f_id for f_id, row in known.items()
+            if f_id not in seen and row['is_active']
+            and (not club or row['club'] in (club, None))
+        ]
+        return new, changed, departed
+
+    def apply_retention(self, raw_days=30, daily_days=365):
+        """
+        Keep every snapshot for `raw_days`, then one per member per day until
+        `daily_days`, then one per member per ISO week. Rollups are untouched.
+        """
+        now = datetime.now()
+        c = self.conn.cursor()
+        removed = 0
+        try:
+            for days, bucket in ((raw_days, LOCAL_DAY_SQL), (daily_days, ROLLUP_BUCKET_SQL['weekly'])):
+                cutoff = int((now - timedelta(days=days)).timestamp())
+                c.execute(DOWNSAMPLE_QUERY.format(bucket=bucket), {'cutoff': cutoff})
+                removed += c.rowcount
+            self.conn.commit()
+        except Exception as e:
+            logger.error(f"❌ Retention failed: {e}")
+            self.conn.rollback()
+            return None
+
+        if removed:
+            self.snapshot_version += 1
+            self.deleted_since_vacuum += removed
+        logger.info(f"🧹 Retention downsampled {removed} old snapshots.")
+        return removed
+
+    def maintain(self, vacuum_ratio=0.2):
+        """
+        Refresh planner statistics; VACUUM once free pages, or snapshots
+        deleted since the last VACUUM, exceed `vacuum_ratio` of the database.
+        Retention thins every member's history, so it mostly leaves pages
+        half empty rather than free.
+        """
+        c = self.conn.cursor()
+        c.execute("ANALYZE")
+        pages = c.execute("PRAGMA page_count").fetchone()[0]
+        free = c.execute("PRAGMA freelist_count").fetchone()[0]
+        rows = c.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+        vacuumed = (bool(pages) and free / pages > vacuum_ratio) or \
+            self.deleted_since_vacuum > vacuum_ratio * (rows + self.deleted_since_vacuum)
+        if vacuumed:
+            c.execute("VACUUM")
+            self.deleted_since_vacuum = 0
+        c.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        size_mb = self.db_path.stat().st_size / 2**20
+        logger.info(f"🧽 Database maintenance done ({size_mb:.1f} MB{', vacuumed' if vacuumed else ''}).")
+        return {'vacuumed': vacuumed, 'size_mb': round(size_mb, 2), 'free_pages': free}
+
+    def get_leaderboard(self, period, club=None, when=None):
+        """
+        Member gains for the day/week/month containing `when` (default: now).
+        The daily board counts from the previous day's last scrape.
+        """
+        c = self.conn.cursor()
+        query = DAILY_LEADERBOARD_QUERY if period == 'daily' else LEADERBOARD_QUERY
+        c.execute(query, (period, period_start(period, when), club, club))
+        return [dict(row) for row in c.fetchall()]
+
+    def get_period_history(self, friend_id, period, limit=12):
+        """A member's most recent daily/weekly/monthly buckets, newest first."""
+        c = self.conn.cursor()
+        c.execute('''
+            SELECT period_start, start_fans, end_fans, gain FROM rollups
+            WHERE period = ? AND member_id = (SELECT id FROM members WHERE friend_id = ?)
+            ORDER BY period_start DESC LIMIT ?
+        ''', (period, friend_id, limit))
+        return [dict(row) for row in c.fetchall()]
+
+    def get_quota_inputs(self, week_start, club=None):
+        """Boundary snapshots (epoch seconds) of the week for every active member (see quota.py)."""
+        c = self.conn.cursor()
+        c.execute(QUOTA_INPUTS_QUERY, {'start': int(week_start.timestamp()), 'club': club})
+        return [dict(row) for row in c.fetchall()]
+
+    def get_range_gain(self, friend_id, start_date, end_date):
+        """
+        Fans gained by one member from the start of `start_date` to the end of
+        `end_date` (ISO dates, inclusive). None if there is no data in range.
+        """
+        c = self.conn.cursor()
+        c.execute(RANGE_GAIN_SELECT + " WHERE m.friend_id = :friend_id", {
+            'start': start_date, 'end': end_date, 'friend_id': friend_id})
+        row = c.fetchone()
+        if not row or row['start_fans'] is None or row['end_fans'] is None:
+            return None
+        return row['end_fans'] - row['start_fans']
+
+    def get_range_leaderboard(self, start_date, end_date, club=None, limit=-1):
+        """Top members by gain between two ISO dates (inclusive)."""
+        c = self.conn.cursor()
+        c.execute(RANGE_LEADERBOARD_QUERY, {
+            'start': start_date, 'end': end_date, 'club': club, 'limit': limit})
+        return [dict(row) for row in c.fetchall()]
+
+    def search_members(self, query, limit=10):
+        """
+        Ranked fuzzy matches over current and past names.
+        Exact and prefix matches come first, then current names, then
+        trigram overlap. Returns one entry per member.
+        """
+        query = query.strip()
+        if not query:
+            return []
+
+        c = self.conn.cursor()
+        params = {'q': query, 'prefix': _like_escape(query) + '%', 'limit': limit * 3}
+        if self.has_fts and len(query) >= 3:
+            # Any shared trigram matches; bm25 ranks by how many are shared
+            params['match'] = ' OR '.join(
+                '"' + query[i:i + 3].replace('"', '""') + '"' for i in range(len(query) - 2))
+            source = "member_names_fts f JOIN member_names n ON n.id = f.rowid"
+            where = "member_names_fts MATCH :match"
+            score = ", f.rank"
+        else:
+            # Too short for trigrams: indexed prefix match. Without FTS5: substring
+            params['pattern'] = params['prefix'] if len(query) < 3 else '%' + params['prefix']
+            source = "member_names n"
+            where = "n.name LIKE :pattern ESCAPE '\\'"
+            score = ""
+
+        c.execute(f'''
+            SELECT m.friend_id, m.current_name, n.name as matched_name, m.club, m.is_active
+            FROM {source}
+            JOIN members m ON m.id = n.member_id
+            WHERE {where}
+            ORDER BY
+                lower(n.name) = lower(:q) DESC,
+                n.name LIKE :prefix ESCAPE '\\' DESC,
+                n.name = m.current_name DESC,
+                m.is_active DESC{score}
+            LIMIT :limit
+        ''', params)
+
+        matches = {}
+        for row in c.fetchall():
+            if row['friend_id'] not in matches:
+                matches[row['friend_id']] = dict(row)
+        return list(matches.values())[:limit]
+
+    def get_name_history(self, friend_id):
+        """Every name a member has been seen under, oldest first."""
+        c = self.conn.cursor()
+        c.execute('''
+            SELECT name, datetime(first_seen, 'unixepoch', 'localtime') as first_seen
+            FROM member_names WHERE member_id = (SELECT id FROM members WHERE friend_id = ?)
+            ORDER BY member_names.first_seen, id
+        ''', (friend_id,))
         return [dict(row) for row in c.fetchall()]
 
     # --- NEW FUNCTION FOR ADMIN LOOKUP ---
     def lookup_member(self, name_query):
         """
-        Finds a member by partial name match and calculates lifetime stats.
+        Finds a member by friend ID or best fuzzy name match and returns lifetime stats.
         """
         c = self.conn.cursor()
         
-        # 1. Find the Member ID (Case insensitive search)
-        c.execute("SELECT friend_id, current_name, joined_at FROM members WHERE current_name LIKE ? LIMIT 1", (f"%{name_query}%",))
+        # 1. Find the Member ID (exact ID from autocomplete, else best name match)
+        c.execute("SELECT friend_id, current_name, joined_at FROM members WHERE friend_id = ?", (name_query,))
         member = c.fetchone()
+        if not member:
+            matches = self.search_members(name_query, limit=1)
+            if matches:
+                c.execute("SELECT friend_id, current_name, joined_at FROM members WHERE friend_id = ?",
+                          (matches[0]['friend_id'],))
+                member = c.fetchone()
         
         if not member:
             return None
             
-        f_id = member['friend_id']
-        name = member['current_name']
-        joined = member['joined_at']
-        
-        # 2. Get First Ever Snapshot (The Baseline)
-        c.execute("SELECT total_fans, timestamp FROM snapshots WHERE friend_id = ? ORDER BY timestamp ASC LIMIT 1", (f_id,))
-        first = c.fetchone()
-        
-        # 3. Get Latest Snapshot (Current Status)
-        c.execute("SELECT total_fans, timestamp FROM snapshots WHERE friend_id = ? ORDER BY timestamp DESC LIMIT 1", (f_id,))
-        last = c.fetchone()
-        
-        if not first or not last:
+        # 2. First and latest snapshot in one query
+        stats = self.get_lifetime_stats(friend_id=member['friend_id'])
+        if not stats:
             return None
-            
-        # Calculate Stats
-        original_fans = first['total_fans']
-        current_fans = last['total_fans']
-        accumulated = current_fans - original_fans
-        
-        return {
-            'name': name,
-            'id': f_id,
-            'joined': joined,
-            'first_seen': first['timestamp'],
-            'last_seen': last['timestamp'],
-            'original_fans': original_fans,
-            'current_fans': current_fans,
-            'accumulated_fans': accumulated
-        }
\ No newline at end of file
+
+        stats = stats[0]
+        stats['past_names'] = [n['name'] for n in self.get_name_history(stats['id'])
+                               if n['name'] != stats['name']]
+        return stats
+
+    def get_lifetime_stats(self, friend_id=None, club=None, active_only=True):
+        """
+        First seen, last seen, original, current and accumulated fans for one
+        member, or for every (active) member of a club, best earners first.
+        """
+        if friend_id is not None:
+            where, params = "m.friend_id = ?", (friend_id,)
+        else:
+            where = "(? IS NULL OR m.club = ?)" + (" AND m.is_active = 1" if active_only else "")
+            params = (club, club)
+
+        c = self.conn.cursor()
+        c.execute(LIFETIME_STATS_QUERY.format(where=where), params)
+        return [dict(row) for row in c.fetchall()]
+
+
+def _like_escape(text):
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+class AsyncDatabase:
+    """
+    Async facade over DatabaseManager for the bot's event loop.
+    Writes go through one dedicated writer connection on its own thread; reads
+    share a small pool of read-only WAL connections, so slash commands keep
+    answering while a snapshot is being written. Every DatabaseManager method
+    is available as a coroutine and takes an optional `timeout=` (seconds).
+    """
+
+    WRITE_METHODS = frozenset({'save_snapshot', 'record_heartbeat', 'rebuild_rollups',
+                               'apply_retention', 'maintain'})
+
+    def __init__(self, db_name="club_data.db", readers=2, timeout=10, write_timeout=60):
+        # The writer creates/migrates the schema before any reader opens it
+        self.writer = DatabaseManager(db_name)
+        # At least one reader: reads never queue behind the writer
+        readers = max(1, readers)
+        self.readers = [DatabaseManager(db_name, readonly=True) for _ in range(readers)]
+        self.timeout = timeout
+        self.write_timeout = write_timeout
+
+        self._idle_readers = asyncio.Queue()
+        for reader in self.readers:
+            self._idle_readers.put_nowait(reader)
+        self._write_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='db-writer')
+        self._read_pool = ThreadPoolExecutor(max_workers=readers, thread_name_prefix='db-reader')
+
+    @property
+    def snapshot_version(self):
+        """Changes whenever the writer commits new data"""
+        return self.writer.snapshot_version
+
+    def __getattr__(self, name):
+        if name.startswith('_') or not callable(getattr(DatabaseManager, name, None)):
+            raise AttributeError(name)
+
+        async def call(*args, timeout=None, **kwargs):
+            # Timed from the caller's view: waiting for a reader counts too
+            with DB_QUERY_SECONDS.time(method=name):
+                if name in self.WRITE_METHODS:
+                    return await self._run(self._write_pool, self.writer, name, args, kwargs,
+                                           timeout or self.write_timeout)
+                reader = await self._idle_readers.get()
+                try:
+                    return await self._run(self._read_pool, reader, name, args, kwargs,
+                                           timeout or self.timeout)
+                finally:
+                    self._idle_readers.put_nowait(reader)
+        return call
+
+    async def _run(self, pool, db, name, args, kwargs, timeout):
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(pool, lambda: getattr(db, name)(*args, **kwargs))
+        try:
+            # shield: a timed-out query is interrupted, not abandoned mid-flight
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            db.conn.interrupt()
+            DB_TIMEOUTS.inc(method=name)
+            logger.error(f"⏱️ Database call {name} timed out after {timeout}s")
+            await asyncio.gather(future, return_exceptions=True)
+            raise
+
+    async def close(self):
+        loop = asyncio.get_running_loop()
+        for pool in (self._write_pool, self._read_pool):
+            await loop.run_in_executor(None, pool.shutdown)
+        for db in [self.writer] + self.readers:
+            db.conn.close()
@@ -4,30 +4,62 @@ from discord import app_commands
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 import asyncio
+import csv
+import io
 import logging
 import sys
-from datetime import datetime, timedelta
+from datetime import datetime
 
 from config import *
+from database import period_start
+import quota
+from metrics import REGISTRY, STAGE_SECONDS, DB_QUERY_SECONDS, SCRAPES, DB_TIMEOUTS
+from report_cache import ReportCache
 from scraper_integration import ChrononesisClubScraperBot
 
-# Logging setup
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[logging.StreamHandler(sys.stdout)]
-)
 logger = logging.getLogger('discord_bot')
 
+
+class ClubBot(commands.Bot):
+    async def close(self):
+        # Stop the persistent browser before the event loop goes away
+        if scraper_bot:
+            await scraper_bot.close()
+        await super().close()
+
+
 # Bot Setup
 intents = discord.Intents.default()
-bot = commands.Bot(command_prefix='!', intents=intents)
+bot = ClubBot(command_prefix='!', intents=intents)
 scheduler = AsyncIOScheduler()
-scraper_bot = ChrononesisClubScraperBot(output_dir=OUTPUT_DIR)
-scrape_lock = asyncio.Lock()
+# Created by setup(), never at import: the spawned scrape worker re-imports
+# this module as __mp_main__ and must not open the database, start a second
+# browser pool or take over logging
+scraper_bot = None
+# Rendered leaderboards, valid until the next snapshot is saved
+report_cache = None
+
+
+def setup():
+    """Logging, the scraper/database bridge and the report cache (bot process only)"""
+    global scraper_bot, report_cache
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
+    scraper_bot = ChrononesisClubScraperBot(
+        output_dir=OUTPUT_DIR, max_concurrency=SCRAPE_CONCURRENCY,
+        browser_profile=BROWSER_PROFILE,
+        isolation=SCRAPE_ISOLATION, timeout=SCRAPE_TIMEOUT,
+        extraction=SCRAPE_EXTRACTION, parser=SCRAPE_PARSER,
+        block_profile=SCRAPE_BLOCK_PROFILE, exports=SCRAPE_EXPORTS,
+        base_url=SCRAPE_BASE_URL, archive_dir=PAGE_ARCHIVE_DIR or None, db_name=DB_PATH,
+        db_readers=DB_READERS, db_timeout=DB_QUERY_TIMEOUT)
+    report_cache = ReportCache(maxsize=REPORT_CACHE_SIZE)
 
 # --- CLUB RULES ---
-WEEKLY_REQ = 3_000_000
+WEEKLY_REQ = WEEKLY_QUOTA
 DAILY_REQ = WEEKLY_REQ / 7
 
 
@@ -35,13 +67,28 @@ DAILY_REQ = WEEKLY_REQ / 7
 async def on_ready():
     logger.info(f'✅ Bot online as {bot.user}')
 
-    # 1. Start the Schedule
+    # 1. Start the Schedule (one staggered job per club)
     if not scheduler.running:
         h, m = map(int, NOTIFICATION_TIME.split(':'))
-        scheduler.add_job(daily_routine, CronTrigger(
-            hour=h, minute=m, timezone=TIMEZONE), id='daily_scrape')
+        for i, club in enumerate(CLUB_NAMES):
+            minutes = (h * 60 + m + i * SCRAPE_STAGGER_MINUTES) % (24 * 60)
+            scheduler.add_job(daily_routine, CronTrigger(
+                hour=minutes // 60, minute=minutes % 60, timezone=TIMEZONE),
+                args=[club], id=f'daily_scrape_{club}')
+        mh, mm = map(int, MAINTENANCE_TIME.split(':'))
+        scheduler.add_job(database_maintenance, CronTrigger(
+            hour=mh, minute=mm, timezone=TIMEZONE), id='database_maintenance')
+        if METRICS_FILE:
+            scheduler.add_job(write_metrics_file, 'interval', minutes=1, id='metrics_file')
         scheduler.start()
 
+        # Prometheus scrape endpoint, local only
+        if METRICS_PORT:
+            try:
+                await REGISTRY.serve(METRICS_PORT)
+            except OSError as e:
+                logger.error(f"❌ Could not serve metrics on port {METRICS_PORT}: {e}")
+
     # 2. FORCE INSTANT SYNC (The Fix)
     try:
         # We grab the Guild ID from your config dictionary
@@ -62,32 +109,163 @@ async def on_ready():
         logger.error(f"❌ Failed to sync commands: {e}")
 
 
-async def daily_routine():
-    await run_and_notify()
+async def daily_routine(club_name):
+    await run_and_notify(clubs=[club_name])
+
+
+async def database_maintenance():
+    """Downsample old snapshots, refresh statistics and reclaim space"""
+    try:
+        await scraper_bot.db.apply_retention(SNAPSHOT_RAW_DAYS, SNAPSHOT_DAILY_DAYS, timeout=600)
+        await scraper_bot.db.maintain(timeout=600)
+    except Exception as e:
+        logger.error(f"❌ Database maintenance failed: {e}")
+
+
+async def write_metrics_file():
+    # Render on the loop that updates the metrics; only the file I/O leaves it
+    text = REGISTRY.render()
+    try:
+        await asyncio.to_thread(REGISTRY.write_file, METRICS_FILE, text)
+    except OSError as e:
+        logger.warning(f"⚠️ Could not write metrics to {METRICS_FILE}: {e}")
 
 
-async def run_and_notify(interaction=None):
-    if scrape_lock.locked():
-        msg = "⚠️ Scraper is busy."
-        if interaction:
-            await interaction.followup.send(msg)
+async def run_and_notify(interaction=None, clubs=None):
+    clubs = clubs or CLUB_NAMES
+    if interaction:
+        # One message per club: the stored snapshot now, the fresh one when it lands
+        await asyncio.gather(*(refresh_and_edit(interaction, c) for c in clubs))
         return
 
-    async with scrape_lock:
-        data = await scraper_bot.run_scrape(CLUB_NAME)
+    # Scrapes already in flight (e.g. a /scrape_now) are joined, not refused
+    results = await scraper_bot.run_scrape(clubs)
+
+    for club_name in clubs:
+        data = results.get(club_name)
+        if not data:
+            logger.warning(f"⚠️ Scrape failed for {club_name}, no report posted.")
+            continue
 
+        # Build the leaderboards now, before the post sends everyone to /leaderboard
+        await warm_reports(club_name)
+
+        embed = await daily_report(club_name, data)
+        for guild_id, channel_id in NOTIFICATION_CHANNELS.items():
+            channel = bot.get_channel(channel_id)
+            if channel:
+                with STAGE_SECONDS.time(stage='embed_send'):
+                    await channel.send(embed=embed)
+
+
+async def refresh_and_edit(interaction, club_name):
+    """
+    Stale-while-revalidate: reply with the latest stored snapshot right away,
+    then edit the message once the (possibly shared) refresh finishes.
+    """
+    joining = scraper_bot.is_busy(club_name)
+    task = scraper_bot.refresh(club_name)
+    try:
+        stale = await scraper_bot.db.get_latest_snapshot(club_name)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not load the stored snapshot: {e}")
+        stale = None
+
+    status = "Joining the scrape already running" if joining else "Refreshing"
+    if stale:
+        embed = await daily_report(club_name, stale['members'])
+        age = format_age(datetime.now().timestamp() - stale['taken_at'])
+        embed.title += " (cached)"
+        embed.color = discord.Color.light_grey()
+        embed.timestamp = datetime.fromtimestamp(stale['taken_at'])
+        embed.description = f"🕒 **Snapshot from {age} ago.** {status}...\n" + embed.description
+        message = await interaction.followup.send(embed=embed, wait=True)
+    else:
+        message = await interaction.followup.send(
+            f"⏳ No stored snapshot for {club_name} yet. {status}...", wait=True)
+
+    data = await asyncio.shield(task)
     if not data:
-        msg = "❌ Scrape failed."
-        if interaction:
-            await interaction.followup.send(msg)
+        await message.edit(content=f"❌ Scrape failed for {club_name}."
+                           + (" Showing the stored snapshot." if stale else ""))
+        return
+
+    await warm_reports(club_name)
+    embed = await daily_report(club_name, data)
+    with STAGE_SECONDS.time(stage='embed_send'):
+        await message.edit(content=None, embed=embed)
+
+
+def format_age(seconds):
+    """Compact age like '45s', '12m', '3h 5m' or '2d 4h'"""
+    seconds = max(int(seconds), 0)
+    days, rest = divmod(seconds, 86400)
+    hours, rest = divmod(rest, 3600)
+    minutes = rest // 60
+    if days:
+        return f"{days}d {hours}h"
+    if hours:
+        return f"{hours}h {minutes}m"
+    return f"{minutes}m" if minutes else f"{seconds}s"
+
+
+async def daily_report(club_name, data):
+    """Daily Check embed for a member list, with quota compliance"""
+    compliance = await quota_records(club_name)
+    embed = build_daily_embed(club_name, data, compliance)
+    await note_unchanged(embed, club_name)
+    return embed
+
+
+async def note_unchanged(embed, club_name):
+    """Footer for a scrape that matched the stored state and wasn't written"""
+    try:
+        state = await scraper_bot.db.get_scrape_state(club_name)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not load scrape state: {e}")
         return
+    if state and state['seen_at'] > state['changed_at']:
+        changed = datetime.fromtimestamp(state['changed_at']).strftime('%H:%M')
+        embed.set_footer(text=f"No changes since {changed} · {state['skipped']} identical scrapes skipped")
+
+
+async def quota_records(club_name=None):
+    """This week's quota compliance for a club (or every club), worst first"""
+    start = quota.week_start()
+    try:
+        rows = await scraper_bot.db.get_quota_inputs(start, club=club_name)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not load quota data: {e}")
+        return []
+    return quota.records(quota.assess(rows, start, WEEKLY_REQ))
+
 
+QUOTA_ICONS = {quota.STATUS_AT_RISK: "🚨", quota.STATUS_ON_TRACK: "📈", quota.STATUS_DONE: "✅"}
+
+
+def quota_line(m):
+    line = f"{QUOTA_ICONS[m['status']]} **{m['name']}**: +{m['gain']:,}"
+    if m['status'] == quota.STATUS_DONE:
+        return line + "\n"
+    needed = "∞" if m['needed_daily'] == float('inf') else f"+{int(m['needed_daily']):,}"
+    return line + f" → ~{m['projected']:,} · needs {needed}/day\n"
+
+
+def quota_summary(compliance):
+    counts = {status: 0 for status in QUOTA_ICONS}
+    for m in compliance:
+        counts[m['status']] += 1
+    return (f"✅ {counts[quota.STATUS_DONE]} done · 📈 {counts[quota.STATUS_ON_TRACK]} on track · "
+            f"🚨 {counts[quota.STATUS_AT_RISK]} at risk")
+
+
+def build_daily_embed(club_name, data, compliance=()):
     data.sort(key=lambda x: x['gain'], reverse=True)
     total_gain = sum(d['gain'] for d in data)
 
     embed = discord.Embed(
-        title=f"📊 Daily Check: {CLUB_NAME}",
-        description=f"**Target:** {int(DAILY_REQ):,}/day (3M/week)",
+        title=f"📊 Daily Check: {club_name}",
+        description=f"**Target:** {int(DAILY_REQ):,}/day ({WEEKLY_REQ:,}/week)",
         timestamp=datetime.now(),
         color=discord.Color.green()
     )
@@ -118,49 +296,160 @@ async def run_and_notify(interaction=None):
         embed.add_field(name="Member Performance",
                         value=desc_text, inline=False)
 
-    if interaction:
-        await interaction.followup.send(embed=embed)
-    else:
-        for guild_id, channel_id in NOTIFICATION_CHANNELS.items():
-            channel = bot.get_channel(channel_id)
-            if channel:
-                await channel.send(embed=embed)
+    if compliance:
+        at_risk = "".join(quota_line(m) for m in compliance
+                          if m['status'] == quota.STATUS_AT_RISK)
+        embed.add_field(name="🎯 Weekly Quota",
+                        value=(quota_summary(compliance) + "\n" + at_risk)[:1024], inline=False)
+    return embed
 
 # ==================== COMMANDS ====================
 
 
+CLUB_CHOICES = [app_commands.Choice(name=c, value=c) for c in CLUB_NAMES[:25]]
+
+LEADERBOARD_PERIODS = {
+    "monthly": "📅 Current Month",
+    "weekly": "📅 Current Week",
+    "daily": "📅 Today",
+}
+
+
+@bot.tree.error
+async def on_app_command_error(interaction: discord.Interaction, error: app_commands.AppCommandError):
+    # Database calls are interrupted after DB_QUERY_TIMEOUT instead of hanging the command
+    if isinstance(getattr(error, 'original', None), asyncio.TimeoutError):
+        message = "⏱️ The database is busy right now, please try again in a moment."
+    else:
+        logger.error(f"❌ Command /{interaction.command.name if interaction.command else '?'} failed: {error}",
+                     exc_info=error)
+        message = "❌ Something went wrong while running this command."
+
+    if interaction.response.is_done():
+        await interaction.followup.send(message, ephemeral=True)
+    else:
+        await interaction.response.send_message(message, ephemeral=True)
+
+
 @bot.tree.command(name="scrape_now", description="Force update (Admin)")
-async def scrape_now(interaction: discord.Interaction):
+@app_commands.describe(club="Club to scrape (default: all tracked clubs)")
+@app_commands.choices(club=CLUB_CHOICES)
+async def scrape_now(interaction: discord.Interaction, club: app_commands.Choice[str] = None):
     # Optional Security Check
     if not interaction.user.guild_permissions.administrator:
         await interaction.response.send_message("⛔ Admin only.", ephemeral=True)
         return
     await interaction.response.defer()
-    await run_and_notify(interaction)
+    await run_and_notify(interaction, clubs=[club.value] if club else None)
 
 
 @bot.tree.command(name="leaderboard", description="Show rankings over time")
 @app_commands.choices(period=[
-    app_commands.Choice(name="📅 Current Month", value="monthly"),
-    app_commands.Choice(name="📅 Current Week", value="weekly"),
-])
-async def leaderboard(interaction: discord.Interaction, period: app_commands.Choice[str]):
+    app_commands.Choice(name=name, value=value) for value, name in LEADERBOARD_PERIODS.items()
+], club=CLUB_CHOICES)
+async def leaderboard(interaction: discord.Interaction, period: app_commands.Choice[str],
+                      club: app_commands.Choice[str] = None):
     await interaction.response.defer()
-    now = datetime.now()
-    if period.value == "monthly":
-        start_date = now.replace(
-            day=1, hour=0, minute=0, second=0, microsecond=0)
-    else:
-        start_date = (now - timedelta(days=now.weekday())
-                      ).replace(hour=0, minute=0, second=0, microsecond=0)
+    club_name = club.value if club else CLUB_NAMES[0]
+    embed = await leaderboard_embed(period.value, club_name)
 
-    rankings = scraper_bot.db.get_leaderboard(start_date.isoformat())
-
-    if not rankings:
+    if not embed:
         await interaction.followup.send("⚠️ No history data found yet.")
         return
 
-    embed = discord.Embed(title=f"🏆 {period.name}", color=discord.Color.gold())
+    await interaction.followup.send(embed=embed)
+
+
+@bot.tree.command(name="quota", description="Weekly quota pace and projections")
+@app_commands.choices(club=CLUB_CHOICES)
+async def quota_status(interaction: discord.Interaction, club: app_commands.Choice[str] = None):
+    await interaction.response.defer()
+    club_name = club.value if club else CLUB_NAMES[0]
+    compliance = await quota_records(club_name)
+
+    if not compliance:
+        await interaction.followup.send("⚠️ No snapshots for this week yet.")
+        return
+
+    embed = discord.Embed(
+        title=f"🎯 Weekly Quota · {club_name}",
+        description=f"**Target:** {WEEKLY_REQ:,}/week\n{quota_summary(compliance)}",
+        color=discord.Color.orange())
+    desc_text = ""
+    for m in compliance:
+        line = quota_line(m)
+        if len(desc_text) + len(line) > 1000:
+            embed.add_field(name="Members", value=desc_text, inline=False)
+            desc_text = line
+        else:
+            desc_text += line
+    if desc_text:
+        embed.add_field(name="Members", value=desc_text, inline=False)
+    embed.set_footer(text="Projection assumes each member keeps their pace since Monday")
+
+    await interaction.followup.send(embed=embed)
+
+
+@bot.tree.command(name="leaderboard_range", description="Show rankings between two dates")
+@app_commands.describe(start="First day, YYYY-MM-DD", end="Last day, YYYY-MM-DD (default: today)",
+                       top="How many members to show (default: all)")
+@app_commands.choices(club=CLUB_CHOICES)
+async def leaderboard_range(interaction: discord.Interaction, start: str, end: str = None,
+                            top: app_commands.Range[int, 1, 100] = None,
+                            club: app_commands.Choice[str] = None):
+    try:
+        start_day = datetime.strptime(start, '%Y-%m-%d').date()
+        end_day = datetime.strptime(end, '%Y-%m-%d').date() if end else datetime.now().date()
+    except ValueError:
+        await interaction.response.send_message("⚠️ Dates must look like 2025-01-31.", ephemeral=True)
+        return
+    if end_day < start_day:
+        await interaction.response.send_message("⚠️ The end date is before the start date.", ephemeral=True)
+        return
+
+    await interaction.response.defer()
+    club_name = club.value if club else CLUB_NAMES[0]
+    key = ('range', start_day, end_day, top, club_name)
+    version = scraper_bot.db.snapshot_version
+    embed = report_cache.get(key, version)
+    if embed is None:
+        rankings = await scraper_bot.db.get_range_leaderboard(
+            start_day.isoformat(), end_day.isoformat(), club=club_name, limit=top or -1)
+        if not rankings:
+            await interaction.followup.send("⚠️ No history data found for that range.")
+            return
+        embed = build_rankings_embed(f"🏆 {start_day} → {end_day} · {club_name}", rankings)
+        report_cache.put(key, version, embed)
+
+    await interaction.followup.send(embed=embed)
+
+
+async def leaderboard_embed(period, club_name):
+    """Leaderboard embed for the current period, from memory when the data hasn't changed"""
+    key = ('leaderboard', period, period_start(period), club_name)
+    # Read the version first: a snapshot landing mid-query leaves this entry stale
+    version = scraper_bot.db.snapshot_version
+    embed = report_cache.get(key, version)
+    if embed is None:
+        rankings = await scraper_bot.db.get_leaderboard(period, club=club_name)
+        if not rankings:
+            return None
+        embed = build_rankings_embed(f"🏆 {LEADERBOARD_PERIODS[period]} · {club_name}", rankings)
+        report_cache.put(key, version, embed)
+    return embed
+
+
+async def warm_reports(club_name):
+    """Render every leaderboard period for a club into the cache"""
+    try:
+        for period in LEADERBOARD_PERIODS:
+            await leaderboard_embed(period, club_name)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not pre-warm leaderboards for {club_name}: {e}")
+
+
+def build_rankings_embed(title, rankings):
+    embed = discord.Embed(title=title, color=discord.Color.gold())
     desc_text = ""
     for i, m in enumerate(rankings, 1):
         line = f"`#{i}` **{m['current_name']}**: +{m['period_gain']:,}\n"
@@ -171,14 +460,13 @@ async def leaderboard(interaction: discord.Interaction, period: app_commands.Cho
             desc_text += line
     if desc_text:
         embed.add_field(name="Rankings", value=desc_text, inline=False)
-
-    await interaction.followup.send(embed=embed)
+    return embed
 
 # --- NEW ADMIN COMMAND ---
 
 
 @bot.tree.command(name="member_lookup", description="Admin: Check lifetime stats for a specific member")
-@app_commands.describe(name="Partial name of the member")
+@app_commands.describe(name="Name (current or past) of the member")
 async def member_lookup(interaction: discord.Interaction, name: str):
     # 🔒 AUTHORIZATION CHECK 🔒
     # Only users with the 'Administrator' role permission can pass this block.
@@ -189,7 +477,7 @@ async def member_lookup(interaction: discord.Interaction, name: str):
     await interaction.response.defer()
 
     # Query Database
-    stats = scraper_bot.db.lookup_member(name)
+    stats = await scraper_bot.db.lookup_member(name)
 
     if not stats:
         await interaction.followup.send(f"❌ Could not find member matching '**{name}**'.")
@@ -215,12 +503,108 @@ async def member_lookup(interaction: discord.Interaction, name: str):
                     value=f"{stats['current_fans']:,}", inline=True)
     embed.add_field(name="💰 Lifetime Accumulation",
                     value=f"**+{stats['accumulated_fans']:,}**", inline=False)
+    if stats['past_names']:
+        embed.add_field(name="🏷️ Also Known As",
+                        value=", ".join(stats['past_names'])[:1000], inline=False)
     embed.set_footer(text=f"Data range: {f_date} to {l_date}")
 
     await interaction.followup.send(embed=embed)
 
+
+@member_lookup.autocomplete('name')
+async def member_lookup_autocomplete(interaction: discord.Interaction, current: str):
+    # Suggestions reveal member names, so they follow the command's admin check
+    if not interaction.user.guild_permissions.administrator:
+        return []
+    matches = await scraper_bot.db.search_members(current, limit=25)
+    choices = []
+    for m in matches:
+        label = m['current_name']
+        if m['matched_name'] != m['current_name']:
+            label += f" (was {m['matched_name']})"
+        if m['club']:
+            label += f" · {m['club']}"
+        # The friend ID pins the exact member picked from the list
+        choices.append(app_commands.Choice(name=label[:100], value=m['friend_id']))
+    return choices
+
+@bot.tree.command(name="club_file", description="Admin: Lifetime stats for every member of a club")
+@app_commands.choices(club=CLUB_CHOICES)
+async def club_file(interaction: discord.Interaction, club: app_commands.Choice[str] = None):
+    if not interaction.user.guild_permissions.administrator:
+        await interaction.response.send_message("⛔ You do not have permission to use this command.", ephemeral=True)
+        return
+
+    await interaction.response.defer()
+    club_name = club.value if club else CLUB_NAMES[0]
+    members = await scraper_bot.db.get_lifetime_stats(club=club_name)
+
+    if not members:
+        await interaction.followup.send(f"❌ No tracked members for **{club_name}**.")
+        return
+
+    embed = discord.Embed(
+        title=f"🗂️ Club File: {club_name}", color=discord.Color.dark_teal())
+    embed.add_field(name="👥 Members", value=str(len(members)), inline=True)
+    embed.add_field(name="💰 Lifetime Accumulation",
+                    value=f"**+{sum(m['accumulated_fans'] for m in members):,}**", inline=True)
+    desc_text = ""
+    for i, m in enumerate(members, 1):
+        line = f"`#{i:02}` **{m['name']}**: +{m['accumulated_fans']:,} (since {str(m['first_seen'])[:10]})\n"
+        if len(desc_text) + len(line) > 1000:
+            embed.add_field(name="Lifetime Performance", value=desc_text, inline=False)
+            desc_text = line
+        else:
+            desc_text += line
+    if desc_text:
+        embed.add_field(name="Lifetime Performance", value=desc_text, inline=False)
+
+    # Full numbers as a spreadsheet-friendly attachment
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=[
+        'name', 'id', 'joined', 'first_seen', 'last_seen',
+        'original_fans', 'current_fans', 'accumulated_fans'], extrasaction='ignore')
+    writer.writeheader()
+    writer.writerows(members)
+    attachment = discord.File(io.BytesIO(buffer.getvalue().encode('utf-8')),
+                              filename=f"{club_name}_club_file.csv")
+
+    await interaction.followup.send(embed=embed, file=attachment)
+
+@bot.tree.command(name="stats", description="Admin: Pipeline timings and database latency")
+async def stats(interaction: discord.Interaction):
+    if not interaction.user.guild_permissions.administrator:
+        await interaction.response.send_message("⛔ You do not have permission to use this command.", ephemeral=True)
+        return
+
+    embed = discord.Embed(title="📈 Bot Stats", timestamp=datetime.now(),
+                          color=discord.Color.blurple())
+    for title, histogram in (("⏱️ Scrape Pipeline", STAGE_SECONDS),
+                             ("🗄️ Database Calls", DB_QUERY_SECONDS)):
+        lines = [timing_line(key[0], s) for key, s in histogram.summary().items()]
+        embed.add_field(name=title, value="\n".join(lines)[:1024] or "No data yet.", inline=False)
+
+    outcomes = [f"{club} · {outcome}: **{count}**" for (club, outcome), count in sorted(SCRAPES.values.items())]
+    timeouts = sum(DB_TIMEOUTS.values.values())
+    embed.add_field(name="📦 Scrapes", value="\n".join(outcomes)[:1024] or "None yet.", inline=False)
+    embed.add_field(name="🧠 Report Cache",
+                    value=f"{report_cache.hits} hits · {report_cache.misses} misses", inline=True)
+    embed.add_field(name="⏳ DB Timeouts", value=str(timeouts), inline=True)
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+def timing_line(name, s):
+    return (f"`{name}` {s['count']}× · p50 {format_seconds(s['p50'])} · "
+            f"p95 {format_seconds(s['p95'])} · max {format_seconds(s['max'])}")
+
+
+def format_seconds(seconds):
+    return f"{seconds * 1000:.1f}ms" if seconds < 1 else f"{seconds:.2f}s"
+
+
 if __name__ == "__main__":
     if not DISCORD_TOKEN:
         print("❌ Error: DISCORD_TOKEN missing in .env")
     else:
+        setup()
         bot.run(DISCORD_TOKEN)
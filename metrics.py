@@ -0,0 +1,198 @@
+"""
+Process-wide timing histograms and counters
+Everything the pipeline measures (scrape stages, snapshot writes, embed sends,
+database calls) lands in REGISTRY, which renders the Prometheus text format
+for a local /metrics endpoint or a textfile-collector file, and summarizes
+itself for the /stats command.
+"""
+
+import asyncio
+import bisect
+import logging
+import math
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+
+logger = logging.getLogger('discord_bot.metrics')
+
+# Seconds; spans a fast DB seek up to a slow Cloudflare wait
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1, 2.5, 5, 10, 20, 30, 60, 120)
+
+# Recent samples kept per label set for the /stats percentiles
+RECENT_SAMPLES = 256
+
+
+def _label_text(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic count per label set"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.values = {}
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(label, '')) for label in self.labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self):
+        for key, value in sorted(self.values.items()):
+            yield f"{self.name}{_label_text(self.labels, key)} {_format_value(value)}"
+
+
+class Histogram:
+    """Cumulative buckets, sum and count per label set, plus recent samples"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self.series = {}
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(label, '')) for label in self.labels)
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = {
+                'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0,
+                'recent': deque(maxlen=RECENT_SAMPLES)}
+        series['counts'][bisect.bisect_left(self.buckets, value)] += 1
+        series['sum'] += value
+        series['count'] += 1
+        series['recent'].append(value)
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the `with` block, even if it raises"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self):
+        for key, series in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), series['counts']):
+                cumulative += count
+                le = _format_value(bound if bound == math.inf else float(bound))
+                yield f"{self.name}_bucket{_label_text(self.labels, key, [('le', le)])} {cumulative}"
+            yield f"{self.name}_sum{_label_text(self.labels, key)} {_format_value(series['sum'])}"
+            yield f"{self.name}_count{_label_text(self.labels, key)} {series['count']}"
+
+    def summary(self):
+        """{label values: {count, mean, p50, p95, max}} from the recent samples"""
+        result = {}
+        for key, series in sorted(self.series.items()):
+            recent = sorted(series['recent'])
+            result[key] = {
+                'count': series['count'],
+                'mean': series['sum'] / series['count'],
+                'p50': recent[(len(recent) - 1) // 2],
+                'p95': recent[min(len(recent) - 1, math.ceil(len(recent) * 0.95) - 1)],
+                'max': recent[-1],
+            }
+        return result
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+
+    def _get(self, cls, name, help, labels, **options):
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = cls(name, help, labels, **options)
+        return metric
+
+    def counter(self, name, help, labels=()):
+        return self._get(Counter, name, help, labels)
+
+    def histogram(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._get(Histogram, name, help, labels, buckets=buckets)
+
+    def reset(self):
+        """Forget every recorded value (the metrics themselves stay registered)"""
+        for metric in self.metrics.values():
+            (metric.series if isinstance(metric, Histogram) else metric.values).clear()
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        for name, metric in sorted(self.metrics.items()):
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def write_file(self, path, text=None):
+        """
+        Atomically write the exposition to `path` (node_exporter textfile
+        collector). Metrics are only safe to read on the event loop, so a
+        caller writing from a thread passes `text` rendered there.
+        """
+        text = self.render() if text is None else text
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp, path)
+
+    async def serve(self, port, host='127.0.0.1'):
+        """Answer every HTTP request on host:port with the current metrics"""
+        async def handle(reader, writer):
+            try:
+                await reader.readuntil(b'\r\n\r\n')
+                body = self.render().encode()
+                writer.write(b"HTTP/1.1 200 OK\r\n"
+                             b"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                             + f"Content-Length: {len(body)}\r\n".encode()
+                             + b"Connection: close\r\n\r\n" + body)
+                await writer.drain()
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                pass
+            finally:
+                writer.close()
+
+        server = await asyncio.start_server(handle, host, port)
+        logger.info(f"📈 Metrics served on http://{host}:{port}/metrics")
+        return server
+
+
+REGISTRY = Registry()
+
+# Pipeline stages: browser_start, navigation, cloudflare, table, stabilize,
+# fixed_wait, network_capture, get_content, parse, normalize, scrape,
+# save_snapshot, embed_send
+STAGE_SECONDS = REGISTRY.histogram(
+    'clubbot_stage_seconds', 'Time spent in each scrape pipeline stage', ('stage',))
+DB_QUERY_SECONDS = REGISTRY.histogram(
+    'clubbot_db_query_seconds', 'Database call latency, including waiting for a connection',
+    ('method',))
+SCRAPES = REGISTRY.counter(
+    'clubbot_scrapes_total', 'Scrapes by club and outcome (saved, unchanged, save_failed, failed)',
+    ('club', 'outcome'))
+DB_TIMEOUTS = REGISTRY.counter(
+    'clubbot_db_timeouts_total', 'Database calls interrupted after their timeout', ('method',))
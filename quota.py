@@ -0,0 +1,92 @@
+"""
+Weekly quota compliance engine
+Turns each member's boundary snapshots for the week into pace, projected
+end-of-week gain and the daily gain still needed. Every member of every club
+is computed at once with NumPy array operations.
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+
+WEEK_DAYS = 7
+# Pace over the first minutes of a week is noise; never divide by less than this
+MIN_ELAPSED_DAYS = 1 / 24
+
+STATUS_DONE = 'done'
+STATUS_ON_TRACK = 'on_track'
+STATUS_AT_RISK = 'at_risk'
+
+
+def week_start(when=None):
+    """Midnight of the Monday starting the ISO week that contains `when`"""
+    when = when or datetime.now()
+    return (when - timedelta(days=when.weekday())).replace(
+        hour=0, minute=0, second=0, microsecond=0)
+
+
+def _days_since(timestamps, origin):
+    """Epoch-second timestamps -> float days after `origin` (NaN for None)"""
+    times = np.array([t if t is not None else np.nan for t in timestamps], dtype=float)
+    return (times - origin.timestamp()) / 86400
+
+
+def assess(rows, start, quota):
+    """
+    Compliance for every row of DatabaseManager.get_quota_inputs.
+    Returns a dict of equal-length arrays: gain, pace (fans/day), projected
+    week gain, needed_daily and at_risk, plus name/friend_id/club/status.
+    """
+    n = len(rows)
+    prev_fans = np.array([r['prev_fans'] if r['prev_fans'] is not None else np.nan for r in rows], dtype=float)
+    first_fans = np.array([r['first_fans'] for r in rows], dtype=float)
+    last_fans = np.array([r['last_fans'] for r in rows], dtype=float)
+    prev_t = _days_since([r['prev_time'] for r in rows], start)
+    first_t = _days_since([r['first_time'] for r in rows], start)
+    last_t = _days_since([r['last_time'] for r in rows], start)
+
+    # Fans at Monday 00:00: interpolate between the last scrape before the week
+    # and the first one inside it. Members first seen this week start from
+    # their first scrape and are paced from then on.
+    has_prev = ~np.isnan(prev_fans)
+    span = np.where(has_prev, first_t - prev_t, 1.0)
+    weight = np.clip(np.divide(-prev_t, span, out=np.zeros(n), where=span > 0), 0.0, 1.0)
+    baseline = np.where(has_prev, prev_fans + (first_fans - prev_fans) * weight, first_fans)
+    observed_from = np.where(has_prev, 0.0, first_t)
+
+    gain = last_fans - baseline
+    elapsed = np.clip(last_t, 0.0, WEEK_DAYS)
+    remaining = WEEK_DAYS - elapsed
+    pace = gain / np.maximum(elapsed - observed_from, MIN_ELAPSED_DAYS)
+    projected = gain + pace * remaining
+
+    shortfall = np.maximum(quota - gain, 0.0)
+    needed_daily = np.divide(shortfall, remaining, out=np.where(shortfall > 0, np.inf, 0.0),
+                             where=remaining > 0)
+
+    done = gain >= quota
+    at_risk = ~done & (projected < quota)
+    status = np.where(done, STATUS_DONE, np.where(at_risk, STATUS_AT_RISK, STATUS_ON_TRACK)).astype(object)
+
+    return {
+        'name': np.array([r['name'] for r in rows], dtype=object),
+        'friend_id': np.array([r['friend_id'] for r in rows], dtype=object),
+        'club': np.array([r['club'] for r in rows], dtype=object),
+        'gain': gain.round().astype(np.int64),
+        'pace': pace.round().astype(np.int64),
+        'projected': projected.round().astype(np.int64),
+        'needed_daily': np.ceil(needed_daily),
+        'at_risk': at_risk,
+        'status': status,
+    }
+
+
+def records(report, club=None):
+    """Rows of an assess() report as dicts, worst projection first"""
+    mask = np.ones(len(report['name']), dtype=bool) if club is None else report['club'] == club
+    order = np.argsort(report['projected'][mask], kind='stable')
+    columns = {k: v[mask][order] for k, v in report.items()}
+    return [
+        {k: (v[i].item() if hasattr(v[i], 'item') else v[i]) for k, v in columns.items()}
+        for i in range(len(order))
+    ]
@@ -0,0 +1,136 @@
+"""
+Rebuild snapshots from the page archive without scraping again
+Every archived fetch is replayed in time order into a new database: each
+distinct page is parsed once, in parallel across CPU cores, with today's
+parser code (the bot's SCRAPE_PARSER backend; --parser strainer or bs4 runs
+parse_member_table), then written through the same save_snapshot /
+record_heartbeat path as a live scrape.
+
+Usage: python reparse_archive.py rebuilt.db [--archive DIR] [--clubs A B] [--since 2025-01-01] [--workers 8]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from config import PAGE_ARCHIVE_DIR, SCRAPE_PARSER, SNAPSHOT_RAW_DAYS, SNAPSHOT_DAILY_DAYS
+from scrape_worker import normalize_members  # also puts chronogenesis_scraper on sys.path
+from page_archive import PageArchive
+
+# Per worker process: the archive and a scraper engine used only for parsing
+_archive = None
+_engine = None
+
+
+def _init_worker(archive_dir, parser):
+    global _archive, _engine
+    from scraper import ChrononesisClubScraper
+
+    _archive = PageArchive(archive_dir)
+    with contextlib.redirect_stdout(io.StringIO()):
+        # output_dir only has to exist; nothing is written there
+        _engine = ChrononesisClubScraper(output_dir=archive_dir, parser=parser, exports=())
+
+
+def parse_page(page):
+    """Normalized members of one archived page ((hash, kind)), or None"""
+    from network_capture import parse_member_payload
+
+    digest, kind = page
+    try:
+        content = _archive.load(digest, kind)
+        with contextlib.redirect_stdout(io.StringIO()):
+            if kind == 'json':
+                raw = parse_member_payload(json.loads(content))
+            else:
+                raw = _engine.parse_html(content)
+    except Exception as e:
+        print(f"⚠️ Could not parse {digest}: {e}", file=sys.stderr)
+        return None
+    return normalize_members({'members': raw}) or None
+
+
+def parse_pages(archive_dir, pages, parser, workers):
+    """{(hash, kind): members or None}, parsed across `workers` processes"""
+    chunksize = max(1, len(pages) // (workers * 8))
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(archive_dir, parser)) as pool:
+        return dict(zip(pages, pool.map(parse_page, pages, chunksize=chunksize)))
+
+
+def replay(db, entries, parsed):
+    """Write the fetches in order, skipping unchanged ones like the bot does"""
+    from scraper_integration import content_hash
+
+    counts = {'saved': 0, 'unchanged': 0, 'failed': 0}
+    for entry in entries:
+        members = parsed.get((entry['hash'], entry['kind']))
+        if not members:
+            counts['failed'] += 1
+            continue
+        digest = content_hash(members)
+        if db.record_heartbeat(entry['club'], digest, when=entry['fetched_at']):
+            counts['unchanged'] += 1
+            continue
+        db.save_snapshot(members, club=entry['club'], content_hash=digest, when=entry['fetched_at'])
+        counts['saved'] += 1
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('path', help='Database file to create (must not exist)')
+    parser.add_argument('--archive', default=PAGE_ARCHIVE_DIR, help='Page archive directory')
+    parser.add_argument('--clubs', nargs='+', help='Only these clubs (default: all)')
+    parser.add_argument('--since', type=datetime.fromisoformat, help='First fetch time to replay')
+    parser.add_argument('--until', type=datetime.fromisoformat, help='Replay fetches before this time')
+    parser.add_argument('--parser', default=SCRAPE_PARSER,
+                        help='HTML backend: lxml, selectolax, strainer or bs4 (the last two use parse_member_table)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--keep-all', action='store_true',
+                        help='Skip snapshot retention (SNAPSHOT_RAW_DAYS / SNAPSHOT_DAILY_DAYS)')
+    args = parser.parse_args()
+
+    from database import DatabaseManager
+
+    path = os.path.abspath(args.path)
+    if os.path.exists(path):
+        sys.exit(f"❌ {path} already exists")
+    if not os.path.isdir(args.archive):
+        sys.exit(f"❌ No page archive at {args.archive}")
+
+    archive = PageArchive(args.archive)
+    entries = archive.entries(args.clubs, args.since, args.until)
+    if not entries:
+        sys.exit("❌ No archived fetches match")
+    pages = list(dict.fromkeys((entry['hash'], entry['kind']) for entry in entries))
+    print(f"📚 {len(entries):,} fetches of {len({e['club'] for e in entries})} clubs, "
+          f"{len(pages):,} distinct pages")
+
+    started = time.perf_counter()
+    parsed = parse_pages(args.archive, pages, args.parser, args.workers)
+    parse_seconds = time.perf_counter() - started
+    empty = sum(1 for members in parsed.values() if not members)
+    print(f"🔍 Parsed {len(pages):,} pages in {parse_seconds:.1f}s on {args.workers} workers "
+          f"({len(pages) / parse_seconds:.0f} pages/s, {empty} without members)")
+
+    started = time.perf_counter()
+    db = DatabaseManager(path)
+    counts = replay(db, entries, parsed)
+    if not args.keep_all:
+        db.apply_retention(SNAPSHOT_RAW_DAYS, SNAPSHOT_DAILY_DAYS)
+    db.maintain()
+    db.conn.close()
+    print(f"💾 {counts['saved']:,} scrapes saved, {counts['unchanged']:,} unchanged, "
+          f"{counts['failed']:,} fetches without members, in {time.perf_counter() - started:.1f}s "
+          f"({os.path.getsize(path) / 2**20:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
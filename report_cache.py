@@ -0,0 +1,39 @@
+"""
+In-memory cache for rendered reports (leaderboard embeds)
+Entries are tagged with the database snapshot version they were built from,
+so every save_snapshot invalidates them without any explicit purge.
+"""
+
+from collections import OrderedDict
+
+
+class ReportCache:
+    """Bounded LRU of {key: (snapshot_version, value)}"""
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, key, version):
+        """Cached value for `key` if it was built from `version`, else None"""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key, version, value):
+        self._entries[key] = (version, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,337 @@
+"""
+Scrape execution backends for ChrononesisClubScraperBot
+ScrapeRunner drives the browser in the current process; ScrapeWorker runs the
+same thing in a child process so the Discord event loop never waits on Chrome,
+HTML parsing or file I/O.
+"""
+
+import sys
+import os
+import queue
+import asyncio
+import logging
+import itertools
+import multiprocessing
+import time
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+# --- PATH SETUP ---
+current_dir = os.path.dirname(os.path.abspath(__file__))
+scraper_path = os.path.join(current_dir, 'chronogenesis_scraper')
+if scraper_path not in sys.path:
+    sys.path.append(scraper_path)
+
+from metrics import STAGE_SECONDS
+
+logger = logging.getLogger('discord_bot')
+
+# Seconds a job may overrun its timeout while the worker cancels it; only a
+# worker that misses this is considered hung and restarted
+CANCEL_GRACE = 30
+
+
+def record_stages(timings):
+    """Feed a scrape's {stage: seconds} into the stage histogram"""
+    for stage, seconds in (timings or {}).items():
+        STAGE_SECONDS.observe(seconds, stage=stage)
+
+
+def normalize_members(raw_data):
+    """
+    Parses the strings from the website into Numbers for the bot/database.
+    """
+    members_list = raw_data.get('members', [])
+    cleaned = []
+
+    for m in members_list:
+        # 1. Clean Total Fans (e.g., "58,844,280")
+        fans_str = str(m.get('total_fans', '0'))
+        try:
+            fans_int = int(fans_str.replace(',', '').replace('+', ''))
+        except ValueError:
+            fans_int = 0
+
+        # 2. Clean Fan Change (e.g., "+1,440,104")
+        # This is the GREEN text from the website
+        change_str = str(m.get('fan_change', '0'))
+        try:
+            change_int = int(change_str.replace(',', '').replace('+', ''))
+        except ValueError:
+            change_int = 0
+
+        cleaned.append({
+            'name': m.get('name', 'Unknown'),
+            'id': m.get('friend_id', 'N/A'),
+            'fans': fans_int,          # Total Fans
+            'gain': change_int,        # Daily Gain (From Website)
+            'rank': m.get('rank', 'N/A'),
+            'role': m.get('role', 'Member'),
+            'last_login': m.get('last_login', '-')
+        })
+
+    return cleaned
+
+
+class ScrapeRunner:
+    """Owns the browser and one scraper engine per club, in this process"""
+
+    def __init__(self, output_dir, max_concurrency=1, browser_profile='desktop',
+                 **engine_options):
+        from scraper import ChrononesisClubScraper
+        from browser_manager import BrowserManager
+        from page_archive import PageArchive
+
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(exist_ok=True)
+        self._engine_class = ChrononesisClubScraper
+
+        # Shared browser with a bounded pool of tabs
+        # The browser manager keeps Chrome (and its Cloudflare clearance) warm
+        # between scrapes; the profile lives next to the output files
+        self.browser_manager = BrowserManager(
+            profile_dir=self.output_dir / 'browser_profile',
+            browser_profile=browser_profile,
+            max_tabs=max_concurrency)
+
+        # engine_options are passed through to every ChrononesisClubScraper;
+        # all clubs share one page archive (and its index lock)
+        archive_dir = engine_options.pop('archive_dir', None)
+        if archive_dir:
+            engine_options['archive'] = PageArchive(archive_dir)
+        self.engines = {}
+        self.engine_options = engine_options
+
+    def get_engine(self, club_name):
+        """Each club scrapes into its own output folder"""
+        if club_name not in self.engines:
+            self.engines[club_name] = self._engine_class(
+                output_dir=str(self.output_dir / club_name),
+                browser_manager=self.browser_manager,
+                **self.engine_options)
+        return self.engines[club_name]
+
+    async def scrape(self, club_name):
+        """Normalized member list for a club, or None if nothing was extracted"""
+        members, timings = await self.scrape_timed(club_name)
+        record_stages(timings)
+        return members
+
+    async def scrape_timed(self, club_name):
+        """(normalized members or None, {stage: seconds}) for a club"""
+        engine = self.get_engine(club_name)
+        data = await engine.scrape_club(club_name)
+        timings = dict(engine.phase_timings)
+        if not data or not data.get('success'):
+            return None, timings
+        started = time.perf_counter()
+        members = normalize_members(data)
+        timings['normalize'] = time.perf_counter() - started
+        return members, timings
+
+    async def close(self):
+        for engine in self.engines.values():
+            await engine.flush_exports()
+        await self.browser_manager.close()
+
+
+class ScrapeWorker:
+    """
+    Runs a ScrapeRunner in a child process, fed over multiprocessing queues.
+    The child times each job from when it gets a tab and cancels it after
+    `timeout`; only a worker that dies or can't cancel a job is restarted.
+    """
+
+    def __init__(self, output_dir, max_concurrency=1, browser_profile='desktop',
+                 timeout=300, **engine_options):
+        self.options = {
+            'output_dir': str(output_dir),
+            'max_concurrency': max_concurrency,
+            'browser_profile': browser_profile,
+            **engine_options,
+        }
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.restarts = 0
+
+        # spawn keeps the child clean of the parent's event loop and sockets
+        self._ctx = multiprocessing.get_context('spawn')
+        self._process = None
+        self._requests = None
+        self._responses = None
+        self._pump_task = None
+        self._pending = {}
+        self._job_ids = itertools.count(1)
+        # Blocking queue reads happen here, never on the event loop
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='scrape-ipc')
+
+    def start(self):
+        self._requests = self._ctx.Queue()
+        self._responses = self._ctx.Queue()
+        self._process = self._ctx.Process(
+            target=worker_main,
+            args=(self._requests, self._responses, self.options, self.max_concurrency, self.timeout),
+            name='scrape-worker', daemon=True)
+        self._process.start()
+        self._pump_task = asyncio.ensure_future(self._pump(self._process, self._responses))
+        logger.info(f"🧵 Scrape worker started (pid {self._process.pid})")
+
+    async def scrape(self, club_name):
+        """Normalized member list from the worker, or None on failure/timeout"""
+        if not self._process or not self._process.is_alive():
+            if self._process:
+                self._restart('worker was not running')
+            else:
+                self.start()
+
+        job_id = next(self._job_ids)
+        loop = asyncio.get_running_loop()
+        started, future = loop.create_future(), loop.create_future()
+        self._pending[job_id] = (started, future)
+        self._requests.put((job_id, club_name))
+
+        try:
+            # Queued behind other clubs for a tab: no clock yet
+            await started
+            # The child cancels the job itself after `timeout`
+            status, payload = await asyncio.wait_for(future, self.timeout + CANCEL_GRACE)
+        except asyncio.TimeoutError:
+            self._pending.pop(job_id, None)
+            logger.error(f"💥 Scrape worker did not cancel {club_name} after {self.timeout}s")
+            self._restart('job could not be cancelled')
+            return None
+
+        if status == 'timeout':
+            logger.error(f"⏱️ Scrape of {club_name} timed out after {self.timeout}s")
+            return None
+        if status == 'error':
+            logger.error(f"❌ Scrape worker failed on {club_name}: {payload}")
+            return None
+        # The child can't reach this process's metrics, so it sends its timings
+        members, timings = payload
+        record_stages(timings)
+        return members
+
+    async def close(self):
+        process = self._process
+        if not process:
+            return
+        self._process = None
+        try:
+            self._requests.put(None)
+            await asyncio.get_running_loop().run_in_executor(
+                None, process.join, self.timeout)
+        finally:
+            if process.is_alive():
+                _kill_tree(process.pid)
+            self._fail_pending('worker closed')
+            self._executor.shutdown(wait=False)
+
+    def _restart(self, reason):
+        logger.warning(f"♻️ Restarting scrape worker: {reason}")
+        process = self._process
+        self._process = None
+        if process and process.is_alive():
+            _kill_tree(process.pid)
+        self._fail_pending(reason)
+        self.restarts += 1
+        self.start()
+
+    def _fail_pending(self, reason):
+        for started, future in self._pending.values():
+            if not started.done():
+                started.set_result(None)
+            if not future.done():
+                future.set_result(('error', reason))
+        self._pending.clear()
+
+    async def _pump(self, process, responses):
+        """Route worker responses to the futures waiting on them"""
+        loop = asyncio.get_running_loop()
+        while self._process is process:
+            try:
+                job_id, status, payload = await loop.run_in_executor(
+                    self._executor, responses.get, True, 1.0)
+            except queue.Empty:
+                if not process.is_alive() and self._process is process:
+                    logger.error(f"💥 Scrape worker exited (code {process.exitcode})")
+                    self._fail_pending('worker exited')
+                    return
+                continue
+            except (EOFError, OSError):
+                return
+
+            if status == 'started':
+                started, _ = self._pending.get(job_id, (None, None))
+                if started and not started.done():
+                    started.set_result(None)
+                continue
+            started, future = self._pending.pop(job_id, (None, None))
+            if future:
+                if not started.done():
+                    started.set_result(None)
+                if not future.done():
+                    future.set_result((status, payload))
+
+
+def _kill_tree(pid):
+    """Kill the worker and the Chrome processes it spawned"""
+    try:
+        import psutil
+        parent = psutil.Process(pid)
+        procs = parent.children(recursive=True) + [parent]
+    except Exception:
+        procs = []
+
+    for proc in procs:
+        try:
+            proc.kill()
+        except Exception:
+            pass
+    if not procs:
+        try:
+            os.kill(pid, 9)
+        except OSError:
+            pass
+
+
+# ==================== CHILD PROCESS ====================
+
+def worker_main(requests, responses, options, max_concurrency=1, timeout=300):
+    """Entry point of the scrape worker process"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - [worker] %(message)s')
+    asyncio.run(_worker_loop(requests, responses, options, max_concurrency, timeout))
+
+
+async def _worker_loop(requests, responses, options, max_concurrency, timeout):
+    runner = ScrapeRunner(**options)
+    loop = asyncio.get_running_loop()
+    jobs = set()
+    # One job per tab: a job's timeout only starts once it can actually run
+    slots = asyncio.Semaphore(max_concurrency)
+
+    async def handle(job_id, club_name):
+        async with slots:
+            responses.put((job_id, 'started', None))
+            try:
+                result = await asyncio.wait_for(runner.scrape_timed(club_name), timeout)
+                responses.put((job_id, 'ok', result))
+            except asyncio.TimeoutError:
+                responses.put((job_id, 'timeout', None))
+            except Exception as e:
+                responses.put((job_id, 'error', f"{type(e).__name__}: {e}"))
+
+    try:
+        while True:
+            message = await loop.run_in_executor(None, requests.get)
+            if message is None:
+                break
+            job = asyncio.ensure_future(handle(*message))
+            jobs.add(job)
+            job.add_done_callback(jobs.discard)
+    finally:
+        if jobs:
+            await asyncio.gather(*jobs, return_exceptions=True)
+        await runner.close()
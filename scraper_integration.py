@@ -1,105 +1,127 @@
-import sys
-import os
+import asyncio
+import hashlib
 import json
 import logging
 from pathlib import Path
-from datetime import datetime
 
 # --- DATABASE IMPORT ---
-# We import the DatabaseManager to handle long-term storage
-from database import DatabaseManager
+# We import the async DatabaseManager facade to handle long-term storage
+from database import AsyncDatabase
+from metrics import SCRAPES, STAGE_SECONDS
+from scrape_worker import ScrapeRunner, ScrapeWorker
 
-# --- PATH SETUP ---
-current_dir = os.path.dirname(os.path.abspath(__file__))
-scraper_path = os.path.join(current_dir, 'chronogenesis_scraper')
-sys.path.append(scraper_path)
+logger = logging.getLogger('discord_bot')
 
-try:
-    from scraper import ChrononesisClubScraper
-except ImportError:
-    raise
 
-logger = logging.getLogger('discord_bot')
+def content_hash(members):
+    """Order-independent digest of a normalized member list (ids, names, fans, gains)"""
+    state = sorted((m['id'], m['name'], m['fans'], m['gain']) for m in members)
+    return hashlib.blake2b(json.dumps(state).encode(), digest_size=16).hexdigest()
 
 
 class ChrononesisClubScraperBot:
-    def __init__(self, output_dir):
+    def __init__(self, output_dir, max_concurrency=1, browser_profile='desktop',
+                 isolation='process', timeout=300, db_name='club_data.db',
+                 db_readers=2, db_timeout=10, **engine_options):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
 
-        # 1. Initialize the Scraper Engine
-        self.engine = ChrononesisClubScraper(output_dir=str(self.output_dir))
-        
-        # 2. Initialize the Database Manager
-        # This creates 'club_data.db' if it doesn't exist
-        self.db = DatabaseManager()
+        # 1. Scrape backend: 'process' runs the browser in a worker process so
+        # the Discord event loop never stalls; 'inline' keeps it in this one.
+        # Either way one warm browser serves a bounded pool of tabs and every
+        # club gets its own scraper engine (engine_options are passed through)
+        if isolation == 'process':
+            self.scraper = ScrapeWorker(
+                self.output_dir, max_concurrency=max_concurrency,
+                browser_profile=browser_profile, timeout=timeout, **engine_options)
+        else:
+            self.scraper = ScrapeRunner(
+                self.output_dir, max_concurrency=max_concurrency,
+                browser_profile=browser_profile, **engine_options)
+
+        # 2. The scrape currently running for each club; callers share it
+        self.inflight = {}
+
+        # 3. Initialize the Database Manager
+        # This creates `db_name` (club_data.db) if it doesn't exist. Queries run on
+        # worker threads: one writer plus `db_readers` read-only connections
+        self.db = AsyncDatabase(db_name, readers=db_readers, timeout=db_timeout)
+
+        # 4. Scrapes that matched the stored state and were not written again
+        self.skipped_writes = 0
+
+    def is_busy(self, club_name):
+        return club_name in self.inflight
+
+    def refresh(self, club_name):
+        """
+        Start a scrape of `club_name`, or join the one already running.
+        Returns the shared task (resolves to the member list or None).
+        """
+        task = self.inflight.get(club_name)
+        if task is None:
+            task = asyncio.ensure_future(self._scrape_one(club_name))
+            self.inflight[club_name] = task
+            task.add_done_callback(lambda _: self.inflight.pop(club_name, None))
+        return task
+
+    async def run_scrape(self, club_names):
+        """
+        Scrapes one club (returns its member list) or a list of clubs
+        concurrently (returns {club_name: member list or None}). Clubs that
+        are already being scraped are joined, not scraped twice.
+        """
+        # shield: a caller giving up must not cancel the scrape for the others
+        if isinstance(club_names, str):
+            return await asyncio.shield(self.refresh(club_names))
+
+        results = await asyncio.gather(
+            *(asyncio.shield(self.refresh(name)) for name in club_names))
+        return dict(zip(club_names, results))
 
-    async def run_scrape(self, club_name):
+    async def _scrape_one(self, club_name):
         """Runs scraper, processes data, and saves to Database"""
         try:
             logger.info(f"🕸️ Starting scrape for {club_name}...")
 
-            # 1. Run the Scraper (Overwrites club_members.json)
-            await self.engine.scrape_club(club_name)
+            # 1. Run the Scraper (returns normalized members)
+            with STAGE_SECONDS.time(stage='scrape'):
+                current_data = await self.scraper.scrape(club_name)
 
-            # 2. Load the fresh data from the file
-            current_data = self._load_current_data()
-            
             if not current_data:
-                logger.warning("⚠️ Scrape finished but no data found.")
+                logger.warning(f"⚠️ Scrape of {club_name} finished but no data found.")
+                SCRAPES.inc(club=club_name, outcome='failed')
                 return None
 
+            # 2. Unchanged since the last write today? Just note the sighting
+            digest = content_hash(current_data)
+            if await self.db.record_heartbeat(club_name, digest):
+                self.skipped_writes += 1
+                SCRAPES.inc(club=club_name, outcome='unchanged')
+                logger.info(f"⏭️ {club_name} is unchanged since its last snapshot, skipping the write.")
+                return current_data
+
             # 3. SAVE TO DATABASE (The Time Machine)
             # This allows us to calculate monthly/weekly rankings later
             logger.info("💾 Saving snapshot to SQLite Database...")
-            self.db.save_snapshot(current_data)
+            with STAGE_SECONDS.time(stage='save_snapshot'):
+                saved = await self.db.save_snapshot(current_data, club=club_name, content_hash=digest)
+
+            # save_snapshot rolls back and returns None when the write fails
+            if saved is None:
+                logger.error(f"❌ Snapshot of {club_name} could not be saved; the scrape is discarded.")
+                SCRAPES.inc(club=club_name, outcome='save_failed')
+                return None
 
+            SCRAPES.inc(club=club_name, outcome='saved')
             return current_data
 
         except Exception as e:
-            logger.error(f"❌ Scraper execution failed: {e}", exc_info=True)
+            logger.error(f"❌ Scraper execution failed for {club_name}: {e}", exc_info=True)
+            SCRAPES.inc(club=club_name, outcome='failed')
             return None
 
-    def _load_current_data(self):
-        target_file = self.output_dir / 'club_members.json'
-        if not target_file.exists():
-            return []
-
-        with open(target_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        return self._normalize_data(data)
-
-    def _normalize_data(self, raw_data):
-        """
-        Parses the strings from the website into Numbers for the bot/database.
-        """
-        members_list = raw_data.get('members', [])
-        cleaned = []
-
-        for m in members_list:
-            # 1. Clean Total Fans (e.g., "58,844,280")
-            fans_str = str(m.get('total_fans', '0'))
-            try:
-                fans_int = int(fans_str.replace(',', '').replace('+', ''))
-            except ValueError:
-                fans_int = 0
-
-            # 2. Clean Fan Change (e.g., "+1,440,104")
-            # This is the GREEN text from the website
-            change_str = str(m.get('fan_change', '0'))
-            try:
-                change_int = int(change_str.replace(',', '').replace('+', ''))
-            except ValueError:
-                change_int = 0
-
-            cleaned.append({
-                'name': m.get('name', 'Unknown'),
-                'id': m.get('friend_id', 'N/A'),
-                'fans': fans_int,          # Total Fans
-                'gain': change_int,        # Daily Gain (From Website)
-                'rank': m.get('rank', 'N/A'),
-                'role': m.get('role', 'Member'),
-                'last_login': m.get('last_login', '-')
-            })
-
-        return cleaned
\ No newline at end of file
+    async def close(self):
+        """Shut down the browser (and worker process, if any) and the database"""
+        await self.scraper.close()
+        await self.db.close()